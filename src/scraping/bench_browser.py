@@ -0,0 +1,99 @@
+"""Page-load benchmark of the full and lean Ubuy browser profiles.
+
+Starts one browser per profile (see get_chrome_options in ubuy_scraper.py) and
+loads the same pages in each, timing navigation until the scraper's content
+selector is present. Bytes transferred are the encodedDataLength of every
+Network.loadingFinished event in Chrome's performance log; unlike Resource
+Timing this includes cross-origin responses without a Timing-Allow-Origin
+header, and requests the lean profile blocks count as zero. Pages are
+loaded under the shared Ubuy rate limit; point --base-url at the mock
+marketplace to benchmark without touching the live site.
+
+Usage:
+    python src/scraping/bench_browser.py [--urls urls.txt] [--base-url http://127.0.0.1:8083]
+"""
+import argparse
+import json
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import ubuy_scraper
+from mock_marketplace import ORIGINS, percentile
+from rate_limit import get_rate_limiter
+
+PRODUCT_SELECTOR = "div#additional-info table, div#technical-info table"
+LISTING_SELECTOR = "div.product-card"
+
+
+def network_totals(driver):
+    """Bytes received and requests sent since the performance log was last read."""
+    transferred = requests = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            transferred += message['params'].get('encodedDataLength', 0)
+        elif message['method'] == 'Network.requestWillBeSent':
+            requests += 1
+    return transferred, requests
+
+
+def measure(driver, url):
+    """Load `url` and return (seconds until the content selector appears, bytes, requests)."""
+    selector = PRODUCT_SELECTOR if '/product/' in url else LISTING_SELECTOR
+    get_rate_limiter(url).acquire()
+    network_totals(driver)  # drop events from the previous page
+    start = time.perf_counter()
+    driver.get(url)
+    try:
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    except TimeoutException:
+        pass
+    elapsed = time.perf_counter() - start
+    transferred, requests = network_totals(driver)
+    return elapsed, transferred, requests
+
+
+def start_driver(lean):
+    """A browser like ubuy_scraper.get_driver() builds, with Chrome's performance log enabled."""
+    options = ubuy_scraper.get_chrome_options(lean)
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    driver = ubuy_scraper.uc.Chrome(driver_executable_path=ubuy_scraper.get_chromedriver_path(), options=options)
+    if lean:
+        ubuy_scraper.block_requests(driver)
+    return driver
+
+
+def run_profile(lean, urls):
+    driver = start_driver(lean)
+    try:
+        return [measure(driver, url) for url in urls]
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--urls', help="file with one URL per line (default: the category listing pages)")
+    parser.add_argument('--base-url', help="replace the Ubuy origin with this one, e.g. the mock marketplace")
+    args = parser.parse_args()
+
+    if args.urls:
+        with open(args.urls, encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = [url for url, _ in ubuy_scraper.CATEGORIES.values()]
+    if args.base_url:
+        urls = [url.replace(ORIGINS["ubuy"], args.base_url.rstrip('/')) for url in urls]
+
+    print(f"{'profile':<8} {'pages':>6} {'mean s':>7} {'p50 s':>6} {'max s':>6} {'KB/page':>8} {'req/page':>9}")
+    for lean in (False, True):
+        results = run_profile(lean, urls)
+        times = [elapsed for elapsed, _, _ in results]
+        kilobytes = sum(transferred for _, transferred, _ in results) / 1024 / len(results)
+        requests = sum(count for _, _, count in results) / len(results)
+        print(f"{'lean' if lean else 'full':<8} {len(results):>6} {sum(times) / len(times):>7.2f} "
+              f"{percentile(times, 50):>6.2f} {max(times):>6.2f} {kilobytes:>8.1f} {requests:>9.1f}")
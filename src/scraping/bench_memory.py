@@ -0,0 +1,90 @@
+"""Memory-per-worker benchmark of the Ubuy browser backends.
+
+For each worker count, opens that many workers with each backend of
+ubuy_scraper.get_driver_pool() -- separate get_driver() Chrome instances, or
+Playwright contexts inside one Chromium -- loads a page in every worker and
+measures the memory of all browser processes started by this script. PSS is
+used where /proc exposes it, so pages shared between Chrome processes are not
+counted twice; otherwise RSS. Linux only.
+
+Usage:
+    python src/scraping/bench_memory.py [--workers 1 2 4 8] [--url https://www.ubuy.ma/en/]
+"""
+import argparse
+import os
+import time
+from contextlib import ExitStack
+
+import ubuy_scraper
+
+
+def child_pids(root):
+    """PIDs of every live descendant of process `root`."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='utf-8') as f:
+                # The command name may contain spaces; the parent PID follows its closing parenthesis
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(parent, []).append(int(entry))
+
+    descendants, stack = [], [root]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            descendants.append(child)
+            stack.append(child)
+    return descendants
+
+
+def process_memory_kb(pid):
+    """PSS of a process in kB, falling back to RSS when smaps_rollup is unavailable."""
+    for path, field in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except OSError:
+            continue
+    return 0
+
+
+def browser_memory_mb():
+    return sum(process_memory_kb(pid) for pid in child_pids(os.getpid())) / 1024
+
+
+def measure(backend, workers, url):
+    """Open `workers` browsers with `backend`, load `url` in each and return their memory in MB."""
+    pool = ubuy_scraper.get_driver_pool(size=workers, backend=backend)
+    try:
+        with ExitStack() as stack:
+            # Hold every loan at once so the pool really opens `workers` browsers
+            drivers = [stack.enter_context(pool.driver()) for _ in range(workers)]
+            for driver in drivers:
+                ubuy_scraper.load_page(driver, url, "body")
+            time.sleep(2)  # let renderers settle after the load
+            return browser_memory_mb()
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--backends', nargs='+', choices=["drivers", "contexts"], default=["drivers", "contexts"])
+    parser.add_argument('--url', default="https://www.ubuy.ma/en/", help="page loaded by every worker")
+    args = parser.parse_args()
+
+    print(f"{'backend':<9} {'workers':>7} {'total MB':>9} {'MB/worker':>10}")
+    for backend in args.backends:
+        for workers in args.workers:
+            try:
+                total = measure(backend, workers, args.url)
+            except Exception as e:
+                print(f"{backend:<9} {workers:>7}  failed: {e}")
+                break
+            print(f"{backend:<9} {workers:>7} {total:>9.0f} {total / workers:>10.1f}")
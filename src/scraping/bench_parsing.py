@@ -0,0 +1,116 @@
+"""Parsing throughput benchmark on saved pages.
+
+Reads the pages stored by the HTTP cache (see http_cache.py) and runs each
+scraper's parse function on them with every available tree builder, with and
+without targeted (SoupStrainer) parsing. The first configuration, html.parser
+on the full page, is what the scrapers did originally; every other
+configuration must return the same dicts. The last rows read the pages' JSON-LD
+first (see structured_data.py); their output can legitimately differ in format,
+so the column shows how many pages matched.
+
+Usage:
+    python src/scraping/bench_parsing.py [--cache-dir data/cache/http] [--repeat 3]
+"""
+import argparse
+import functools
+import glob
+import gzip
+import json
+import os
+import time
+
+import html_parsing
+import structured_data
+import ebay_scraper
+import flipkart_scraper
+import ubuy_scraper
+
+
+def classify(url, ebay_category):
+    """Map a cached URL to the parse function that handles it, or None."""
+    if 'ebay.' in url and '/itm/' in url:
+        return 'ebay product', functools.partial(ebay_scraper.parse_product_page, category=ebay_category)
+    if 'ebay.' in url and '/sch/' in url:
+        return 'ebay search', ebay_scraper.parse_search_page
+    if 'flipkart.' in url and 'pid=' in url:
+        return 'flipkart product', flipkart_scraper.parse_product_page
+    if 'ubuy.' in url and '/product/' in url:
+        return 'ubuy product', ubuy_scraper.parse_product_page
+    return None, None
+
+
+def load_pages(cache_dir, ebay_category):
+    """Load (kind, parse function, html) for every cached page we know how to parse."""
+    pages = []
+    for meta_path in glob.glob(os.path.join(cache_dir, '*', '*.json')):
+        with open(meta_path, encoding='utf-8') as f:
+            url = json.load(f)['url']
+        kind, parse = classify(url, ebay_category)
+        if kind is None:
+            continue
+        with gzip.open(meta_path[:-len('.json')] + '.html.gz', 'rt', encoding='utf-8') as f:
+            pages.append((kind, parse, f.read()))
+    return pages
+
+
+def comparable(result):
+    # The collection timestamp changes between runs and is not parser output
+    if isinstance(result, dict):
+        return {key: value for key, value in result.items() if key != 'Collection Date'}
+    return result
+
+
+def run(pages, backend, targeted, structured, repeat):
+    html_parsing.BACKEND = backend
+    html_parsing.TARGETED = targeted
+    structured_data.ENABLED = structured
+    results = [comparable(parse(html)) for _, parse, html in pages]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, parse, html in pages:
+            parse(html)
+    elapsed = time.perf_counter() - start
+    return elapsed, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cache-dir', default='data/cache/http')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--ebay-category', default="Laptops",
+                        help="category used to pick spec fields from eBay item pages")
+    args = parser.parse_args()
+
+    pages = load_pages(args.cache_dir, args.ebay_category)
+    if not pages:
+        raise SystemExit(f"No parseable pages found in {args.cache_dir}; run a scraper with the cache enabled first.")
+
+    total_mb = sum(len(html.encode('utf-8')) for _, _, html in pages) / 1e6
+    kinds = {}
+    for kind, _, _ in pages:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print(f"{len(pages)} pages ({total_mb:.1f} MB): " + ", ".join(f"{n} {k}" for k, n in sorted(kinds.items())))
+
+    configurations = [('html.parser', False, False)] + [
+        (backend, targeted, False)
+        for backend in html_parsing.available_backends()
+        for targeted in (False, True)
+        if (backend, targeted) != ('html.parser', False)
+    ] + [(html_parsing.available_backends()[0], True, True)]
+
+    print(f"\n{'backend':<12} {'targeted':<9} {'json-ld':<8} {'pages/s':>9} {'MB/s':>8} {'speedup':>8}  same output")
+    baseline_time = baseline_results = None
+    for backend, targeted, structured in configurations:
+        elapsed, results = run(pages, backend, targeted, structured, args.repeat)
+        if baseline_time is None:
+            baseline_time, baseline_results = elapsed, results
+        pages_per_second = len(pages) * args.repeat / elapsed
+        mb_per_second = total_mb * args.repeat / elapsed
+        matches = sum(result == baseline for result, baseline in zip(results, baseline_results))
+        if structured:
+            same = f"{matches}/{len(pages)}"
+        else:
+            same = "yes" if matches == len(pages) else "NO"
+        print(f"{backend:<12} {str(targeted):<9} {str(structured):<8} {pages_per_second:>9.1f} {mb_per_second:>8.2f} "
+              f"{baseline_time / elapsed:>7.2f}x  {same}")
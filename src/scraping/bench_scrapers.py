@@ -0,0 +1,186 @@
+"""End-to-end scraper load benchmark against the local mock marketplace.
+
+Starts mock_marketplace.py in a subprocess and runs the real scraper flows against
+it: `scrape_ebay_search`, `scrape_flipkart` and `scrape_ubuy` (the Ubuy flow needs a
+working Chrome and is skipped otherwise). Each flow runs in its own process so its
+peak RSS is measured in isolation. Only pages recorded by the HTTP cache can be
+served, so run the scrapers once with the cache enabled first.
+
+Requests/s and the status mix come from the mock server; p50/p99 are the server's
+response times, injected latency included. By default the per-domain rate limit is
+raised to --rate so the benchmark measures the scrapers, not the politeness limit;
+--site-rates keeps the production rates from rate_limit.PLATFORM_RATES.
+
+Usage:
+    python src/scraping/bench_scrapers.py [--pages 2] [--categories 2] [--latency 0.2]
+        [--error-rate 0.02] [--throttle-rate 0.02] [--platforms ebay flipkart ubuy]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import mock_marketplace
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its reaped children, in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(own / 1024, 1), round(children / 1024, 1)
+
+
+def point_at_mock(platform, base_url, rate):
+    """Route the shared per-process services for `platform` to the mock host."""
+    import dedupe
+    import rate_limit
+
+    host = urlsplit(base_url).netloc
+    dedupe.PLATFORM_HOSTS[host] = platform
+    origin = urlsplit(mock_marketplace.ORIGINS[platform]).netloc
+    for key, site_rate in list(rate_limit.PLATFORM_RATES.items()):
+        site, _, channel = key.partition('#')
+        if site == origin:
+            mock_key = f"{host}#{channel}" if channel else host
+            rate_limit.PLATFORM_RATES[mock_key] = site_rate if rate is None else (rate, max(1, int(rate)))
+
+
+def mock_url(platform, base_url, url):
+    return url.replace(mock_marketplace.ORIGINS[platform], base_url)
+
+
+def run_ebay(base_url, args, output):
+    import ebay_scraper
+
+    ebay_scraper.EBAY_SEARCH_URL = f"{base_url}/sch/i.html"
+    categories = dict(list(ebay_scraper.CATEGORIES.items())[:args.categories])
+    with ProcessPoolExecutor() as parse_executor:
+        results = asyncio.run(ebay_scraper.scrape_ebay_search(categories, args.pages, parse_executor=parse_executor,
+                                                              listing_only=args.listing_only))
+    return sum(len(products) for products in results.values())
+
+
+def run_flipkart(base_url, args, output):
+    import flipkart_scraper
+
+    flipkart_scraper.FLIPKART_BASE_URL = base_url
+    count = 0
+    for category_name, config in list(flipkart_scraper.CATEGORIES.items())[:args.categories]:
+        url = mock_url('flipkart', base_url, config["url"])
+        count += flipkart_scraper.scrape_flipkart(url, args.pages, category_name, output_dir=output)
+    return count
+
+
+def run_ubuy(base_url, args, output):
+    import ubuy_scraper
+    from checkpoint import ScrapeCheckpoint
+
+    ubuy_scraper.UBUY_BASE_URL = base_url
+    count = 0
+    pool = ubuy_scraper.get_driver_pool()
+    http = ubuy_scraper.BrowserSession() if args.hybrid else None
+    try:
+        for category, (url, _) in list(ubuy_scraper.CATEGORIES.items())[:args.categories]:
+            checkpoint = ScrapeCheckpoint(output, category)
+            count += ubuy_scraper.scrape_ubuy(pool, mock_url('ubuy', base_url, url), args.pages, checkpoint,
+                                              http=http)
+    finally:
+        pool.close()
+        if http is not None:
+            http.close()
+    return count
+
+
+FLOWS = {"ebay": run_ebay, "flipkart": run_flipkart, "ubuy": run_ubuy}
+
+
+def run_flow(platform, base_url, args, results):
+    """Process target: run one scraper flow and report its item count, time and memory."""
+    point_at_mock(platform, base_url, None if args.site_rates else args.rate)
+    start = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as output:
+            items = FLOWS[platform](base_url, args, output)
+        error = None
+    except Exception as e:
+        items, error = 0, f"{type(e).__name__}: {e}"
+    from retry import get_retry_policy
+    results.put({
+        'items': items,
+        'wall': time.perf_counter() - start,
+        'rss': peak_rss_mb(),
+        'retries': get_retry_policy().stats()['retries'],
+        'error': error,
+    })
+
+
+def serve(market):
+    asyncio.run(market.serve())
+
+
+def server_call(base_url, endpoint):
+    with urllib.request.urlopen(f"{base_url}/{endpoint}", timeout=5) as response:
+        return json.load(response)
+
+
+def wait_for_server(base_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return server_call(base_url, "__reset")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mock_marketplace.add_arguments(parser)
+    parser.add_argument('--platforms', nargs='+', choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument('--pages', type=int, default=2, help="search/listing pages per category")
+    parser.add_argument('--categories', type=int, default=2, help="categories per platform")
+    parser.add_argument('--rate', type=float, default=50.0, help="requests/s allowed per mock host")
+    parser.add_argument('--listing-only', action='store_true', help="run the eBay flow in listing-only mode")
+    parser.add_argument('--hybrid', action='store_true', help="run the Ubuy flow in hybrid browser/HTTP mode")
+    parser.add_argument('--site-rates', action='store_true', help="keep the production per-site rate limits")
+    args = parser.parse_args()
+
+    market = mock_marketplace.from_arguments(args)
+    server = multiprocessing.Process(target=serve, args=(market,), daemon=True)
+    server.start()
+
+    rows = []
+    try:
+        for platform in args.platforms:
+            base_url = market.base_url(platform)
+            wait_for_server(base_url)
+            results = multiprocessing.Queue()
+            flow = multiprocessing.Process(target=run_flow, args=(platform, base_url, args, results))
+            flow.start()
+            result = results.get()
+            flow.join()
+            rows.append((platform, result, server_call(base_url, "__stats")))
+    finally:
+        server.terminate()
+
+    print(f"\n{'platform':<10} {'items':>6} {'requests':>9} {'req/s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'retries':>8} {'RSS MB':>7} {'child MB':>9}  statuses")
+    for platform, result, stats in rows:
+        if result['error']:
+            print(f"{platform:<10} skipped: {result['error']}")
+            continue
+        own_rss, child_rss = result['rss']
+        print(f"{platform:<10} {result['items']:>6} {stats['requests']:>9} "
+              f"{stats['requests'] / result['wall']:>7.1f} {format_ms(stats['p50']):>7} {format_ms(stats['p99']):>7} "
+              f"{result['retries']:>8} {own_rss:>7} {child_rss:>9}  {stats['statuses']}")
@@ -0,0 +1,96 @@
+import asyncio
+import re
+import threading
+
+import aiohttp
+from yarl import URL
+
+from http_session import DEFAULT_LIMIT_PER_HOST, create_session
+from rate_limit import get_rate_limiter
+from retry import get_retry_policy
+
+# Rate-limit channel of plain-HTTP fetches, kept apart from the browser's page loads
+HTTP_CHANNEL = "http"
+
+# Answers that mean the site wants a real browser to pass a bot check
+CHALLENGE_STATUSES = {403}
+CHALLENGE_RE = re.compile(r"""<iframe[^>]+src=["'][^"']*captcha|cf-chl-|challenge-platform""", re.IGNORECASE)
+
+
+class ChallengeDetected(Exception):
+    """Raised when a plain HTTP response is a bot check that only a browser can pass."""
+
+
+class BrowserSession:
+    """Plain-HTTP client that borrows the cookies and User-Agent of a browser.
+
+    The browser passes the site's bot checks once; `update_from_driver()` copies its
+    credentials, and `fetch()` then downloads pages over one pooled aiohttp session
+    at HTTP-client speed. Requests run on a private event loop in a background
+    thread, so `fetch()` can be called from several worker threads at once. A
+    response that is a bot check raises ChallengeDetected so the caller can fall
+    back to the browser.
+    """
+
+    def __init__(self, limit_per_host=DEFAULT_LIMIT_PER_HOST):
+        self.headers = {}
+        self.fetched = 0
+        self.challenges = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._session = self._run(self._create_session(limit_per_host))
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _create_session(limit_per_host):
+        # unsafe=True keeps cookies for IP hosts such as the local mock marketplace
+        return create_session(limit_per_host=limit_per_host, cookie_jar=aiohttp.CookieJar(unsafe=True))
+
+    def update_from_driver(self, driver):
+        """Copy the browser's cookies, User-Agent and current page (as Referer)."""
+        cookies = driver.get_cookies()
+        user_agent = driver.execute_script("return navigator.userAgent")
+        referer = driver.current_url
+        scheme = URL(referer).scheme or 'https'
+
+        async def update():
+            for cookie in cookies:
+                domain = cookie.get('domain', '').lstrip('.')
+                self._session.cookie_jar.update_cookies({cookie['name']: cookie['value']},
+                                                        URL(f"{scheme}://{domain}/"))
+
+        self._run(update())
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Referer': referer,
+        }
+
+    def fetch(self, url):
+        """GET a page under the site's plain-HTTP rate limit and the retry policy and return its HTML."""
+        return self._run(get_retry_policy().call_async(self._fetch, url))
+
+    async def _fetch(self, url):
+        await get_rate_limiter(url, channel=HTTP_CHANNEL).acquire_async()
+        async with self._session.get(url, headers=self.headers) as response:
+            html = await response.text()
+            # Bot checks come back as 403, or as 200/503 pages with a challenge widget
+            if response.status in CHALLENGE_STATUSES or CHALLENGE_RE.search(html):
+                self.challenges += 1
+                raise ChallengeDetected(f"HTTP {response.status} challenge for {url}")
+            response.raise_for_status()
+        self.fetched += 1
+        return html
+
+    def stats(self):
+        return {'fetched': self.fetched, 'challenges': self.challenges}
+
+    def close(self):
+        self._run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,129 @@
+import csv
+import json
+import os
+
+
+class ScrapeCheckpoint:
+    """Streams scraped records to disk in batches and tracks finished pages and URLs.
+
+    Records are appended to a hidden JSON-lines spool file next to the output, and a
+    small JSON checkpoint remembers which pages and product URLs are already done.
+    A restarted run with the same directory and name picks up where the last one
+    stopped; `finalize()` converts the spool into the final CSV and removes both files.
+    """
+
+    def __init__(self, directory, name, batch_size=50, fieldnames=None):
+        os.makedirs(directory, exist_ok=True)
+        self.spool_path = os.path.join(directory, f".{name}.partial.jsonl")
+        self.state_path = os.path.join(directory, f".{name}.checkpoint.json")
+        self.batch_size = batch_size
+        self._buffer = []
+        self._on_saved = []
+
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        self.pages_done = set(state.get('pages_done', []))
+        self.urls_done = set(state.get('urls_done', []))
+        self.records_written = state.get('records_written', 0)
+        self.fieldnames = list(fieldnames or state.get('fieldnames', []))
+
+        if state:
+            print(f"Resuming from checkpoint {self.state_path}: {len(self.pages_done)} pages, "
+                  f"{self.records_written} records already done")
+            self._truncate_spool()
+        elif os.path.exists(self.spool_path):
+            # A spool without a checkpoint was never committed; start over
+            os.remove(self.spool_path)
+
+    def is_page_done(self, page):
+        return page in self.pages_done
+
+    def is_url_done(self, url):
+        return url in self.urls_done
+
+    def mark_page_done(self, page):
+        """Mark a page as finished; its records are flushed first so the state stays consistent."""
+        self.pages_done.add(page)
+        self.flush()
+
+    def add(self, record, url=None, on_saved=None):
+        """Buffer one record and flush the batch to disk once it is full.
+
+        `on_saved` is called once the record and the checkpoint state are on disk, e.g.
+        to mark the item as fetched in a SeenStore only when a crash can no longer lose it.
+        """
+        self._buffer.append(record)
+        if on_saved is not None:
+            self._on_saved.append(on_saved)
+        for key in record:
+            if key not in self.fieldnames:
+                self.fieldnames.append(key)
+        if url is not None:
+            self.urls_done.add(url)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Append buffered records to the spool, then atomically save the checkpoint."""
+        if self._buffer:
+            with open(self.spool_path, 'a', encoding='utf-8') as f:
+                for record in self._buffer:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.records_written += len(self._buffer)
+            self._buffer = []
+        self._save_state()
+        saved, self._on_saved = self._on_saved, []
+        for callback in saved:
+            callback()
+
+    def finalize(self, output_path, encoding='utf-8'):
+        """Write all spooled records to `output_path` as CSV and clear the checkpoint."""
+        self.flush()
+        if self.records_written == 0:
+            self._remove_files()
+            return 0
+
+        with open(self.spool_path, encoding='utf-8') as spool, \
+                open(output_path, 'w', newline='', encoding=encoding) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames, restval='', extrasaction='ignore')
+            writer.writeheader()
+            for line in spool:
+                writer.writerow(json.loads(line))
+
+        count = self.records_written
+        self._remove_files()
+        print(f"Saved {count} records to {output_path}")
+        return count
+
+    def _save_state(self):
+        state = {
+            'pages_done': sorted(self.pages_done),
+            'urls_done': sorted(self.urls_done),
+            'records_written': self.records_written,
+            'fieldnames': self.fieldnames,
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _truncate_spool(self):
+        # Drop records appended after the last saved checkpoint (e.g. a crash mid-flush)
+        if not os.path.exists(self.spool_path):
+            self.pages_done, self.urls_done = set(), set()
+            self.records_written = 0
+            return
+        with open(self.spool_path, 'r+', encoding='utf-8') as f:
+            for _ in range(self.records_written):
+                if not f.readline():
+                    break
+            f.truncate(f.tell())
+
+    def _remove_files(self):
+        for path in (self.spool_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
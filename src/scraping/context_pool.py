@@ -0,0 +1,153 @@
+import asyncio
+import fnmatch
+import threading
+
+from selenium.common.exceptions import TimeoutException
+
+from browser_session import ChallengeDetected
+from driver_pool import DriverPool
+from retry import get_retry_policy
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
+except ImportError:  # optional backend; `pip install playwright && playwright install chromium`
+    async_playwright = None
+
+# Resource types a lean context never downloads
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+class ContextBrowser:
+    """One Chromium process driven through Playwright's async API.
+
+    The Playwright event loop runs in a background thread, so worker threads can use
+    the pages it opens like WebDriver instances. Every page gets its own browser
+    context (separate cookies and cache), which costs a renderer process rather
+    than a whole browser.
+    """
+
+    def __init__(self, headless=False, lean=True, blocked_patterns=(), user_agent=None):
+        if async_playwright is None:
+            raise RuntimeError("Playwright is not installed; run `pip install playwright && playwright install chromium`")
+        self.lean = lean
+        self.blocked_patterns = tuple(blocked_patterns)
+        self.user_agent = user_agent
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._playwright, self._browser = self.run(self._launch(headless))
+
+    def run(self, coroutine):
+        """Run a coroutine on the browser's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _launch(self, headless):
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=headless, args=[
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled",
+        ])
+        return playwright, browser
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or \
+                any(fnmatch.fnmatch(request.url, pattern) for pattern in self.blocked_patterns):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_page(self):
+        user_agent = self.user_agent() if callable(self.user_agent) else self.user_agent
+        context = await self._browser.new_context(user_agent=user_agent, viewport={"width": 1920, "height": 1080})
+        if self.lean:
+            await context.route("**/*", self._route)
+        return context, await context.new_page()
+
+    def new_page(self):
+        """Open a page in a fresh browser context."""
+        context, page = self.run(self._new_page())
+        return ContextPage(self, context, page)
+
+    def close(self):
+        async def shutdown():
+            await self._browser.close()
+            await self._playwright.stop()
+
+        self.run(shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class ContextPage:
+    """A page in its own browser context, offering the WebDriver calls the scrapers use."""
+
+    def __init__(self, browser, context, page):
+        self.browser = browser
+        self.context = context
+        self.page = page
+
+    @property
+    def current_url(self):
+        return self.page.url
+
+    def load(self, url, ready_selector, challenge_selector, timeout=10):
+        """Navigate to `url` and return its HTML once the content or a challenge appears.
+
+        Raises ChallengeDetected for a challenge and selenium's TimeoutException when
+        neither shows up in time, like the WebDriver path of ubuy_scraper.load_page().
+        """
+        return self.browser.run(self._load(url, ready_selector, challenge_selector, timeout))
+
+    async def _load(self, url, ready_selector, challenge_selector, timeout):
+        wait_until = "domcontentloaded" if self.browser.lean else "load"
+        await get_retry_policy().call_async(self.page.goto, url, wait_until=wait_until, retry_on=(PlaywrightError,))
+        try:
+            await self.page.wait_for_selector(f"{ready_selector}, {challenge_selector}", state="attached",
+                                              timeout=timeout * 1000)
+        except PlaywrightTimeoutError as e:
+            raise TimeoutException(str(e)) from e
+        if await self.page.query_selector(challenge_selector):
+            raise ChallengeDetected(f"CAPTCHA on {url}")
+        return await self.page.content()
+
+    def execute_script(self, script):
+        """Run a WebDriver-style script body (e.g. "return navigator.userAgent")."""
+        return self.browser.run(self.page.evaluate(f"() => {{ {script} }}"))
+
+    def get_cookies(self):
+        return self.browser.run(self.context.cookies())
+
+    def quit(self):
+        self.browser.run(self.context.close())
+
+
+class ContextPool(DriverPool):
+    """DriverPool of browser contexts that share one Chromium process.
+
+    A drop-in alternative to a pool of separate Chrome instances: each worker still
+    gets an isolated session, but adding a worker adds a context instead of a browser.
+    """
+
+    def __init__(self, size=5, max_pages=50, retire_on=(), headless=False, lean=True, blocked_patterns=(),
+                 user_agent=None):
+        self.browser = ContextBrowser(headless=headless, lean=lean, blocked_patterns=blocked_patterns,
+                                      user_agent=user_agent)
+        super().__init__(self.browser.new_page, size=size, max_pages=max_pages, retire_on=retire_on)
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except PlaywrightError:
+            return False
+
+    def close(self):
+        super().close()
+        self.browser.close()
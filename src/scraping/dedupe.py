@@ -0,0 +1,111 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+EBAY_ITEM_RE = re.compile(r'/itm/(?:[^/]+/)?(\d+)')
+
+# Hosts that stand in for a platform, e.g. the local mock marketplace: {"127.0.0.1:8081": "ebay"}
+PLATFORM_HOSTS = {}
+
+
+def platform_of(host):
+    """Name of the platform ('ebay', 'flipkart' or 'ubuy') serving `host`, or None."""
+    host = host.lower()
+    if host in PLATFORM_HOSTS:
+        return PLATFORM_HOSTS[host]
+    for platform in ('ebay', 'flipkart', 'ubuy'):
+        if f'{platform}.' in host:
+            return platform
+    return None
+
+
+def canonical_item_id(url):
+    """Reduce a product URL to a platform item ID such as 'ebay:1234567890'.
+
+    eBay items are keyed by the number in /itm/<id>, Flipkart products by the `pid`
+    query parameter and Ubuy products by their URL path. Returns None for URLs that
+    are not recognised product pages.
+    """
+    parts = urlsplit(url)
+    platform = platform_of(parts.netloc)
+    if platform == 'ebay':
+        match = EBAY_ITEM_RE.search(parts.path)
+        return f"ebay:{match.group(1)}" if match else None
+    if platform == 'flipkart':
+        pid = parse_qs(parts.query).get('pid')
+        return f"flipkart:{pid[0]}" if pid else None
+    if platform == 'ubuy' and parts.path.strip('/'):
+        return f"ubuy:{parts.path.rstrip('/')}"
+    return None
+
+
+class SeenStore:
+    """Persistent SQLite index of item IDs and when they were last fetched."""
+
+    def __init__(self, path="data/cache/seen_items.sqlite", freshness_hours=12):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.freshness = freshness_hours * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (item_id TEXT PRIMARY KEY, fetched_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def is_fresh(self, item_id):
+        """True if the item was fetched within the freshness window."""
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM seen WHERE item_id = ?", (item_id,)).fetchone()
+        return row is not None and time.time() - row[0] < self.freshness
+
+    def mark(self, item_id):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO seen (item_id, fetched_at) VALUES (?, ?) "
+                "ON CONFLICT(item_id) DO UPDATE SET fetched_at = excluded.fetched_at",
+                (item_id, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ItemDeduper:
+    """Decides which product URLs still need fetching in this run.
+
+    A URL is skipped if its item ID was already queued earlier in the run (the same
+    listing on several search pages) or, when a SeenStore is given, if it was fetched
+    within the store's freshness window by a previous run.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._queued = set()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+        self.fresh = 0
+
+    def should_fetch(self, url):
+        item_id = canonical_item_id(url)
+        if item_id is None:
+            return True
+        with self._lock:
+            if item_id in self._queued:
+                self.duplicates += 1
+                return False
+            self._queued.add(item_id)
+        if self.store is not None and self.store.is_fresh(item_id):
+            self.fresh += 1
+            return False
+        return True
+
+    def mark_fetched(self, url):
+        item_id = canonical_item_id(url)
+        if item_id is not None and self.store is not None:
+            self.store.mark(item_id)
+
+    def stats(self):
+        return {'queued': len(self._queued), 'duplicates': self.duplicates, 'fresh_skipped': self.fresh}
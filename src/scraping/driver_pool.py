@@ -0,0 +1,127 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverPool:
+    """A fixed number of independent WebDriver instances shared by worker threads.
+
+    `driver()` lends one browser to the calling worker for the duration of a
+    `with` block, so no two workers ever navigate the same browser. Browsers are
+    started lazily with `factory`, checked before each loan and replaced when they
+    no longer respond, and recycled after `max_pages` loads to keep memory bounded.
+    A browser whose `with` block raises one of `retire_on` (e.g. a bot check) is
+    replaced as well, so the next page starts from a fresh profile.
+    """
+
+    def __init__(self, factory, size=5, max_pages=50, retire_on=()):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.retire_on = tuple(retire_on)
+        self.started = 0
+        self.recycled = 0
+        self._idle = []  # (driver, pages) stack, so the warmest browser is lent first
+        self._created = 0
+        # Guards the idle stack and browser count; waiting borrowers are woken on every
+        # return and whenever a slot frees up for a new browser
+        self._available = threading.Condition()
+        self._all = set()
+        # Chrome start-up (and driver patching) is not safe to run concurrently
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            driver = self.factory()
+        with self._available:
+            self.started += 1
+            self._all.add(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._available:
+            self._all.discard(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error closing browser: {e}")
+
+    def _free_slot(self, recycled=False):
+        """Give up the slot of a browser that was discarded or failed to start."""
+        with self._available:
+            self._created -= 1
+            if recycled:
+                self.recycled += 1
+            self._available.notify()
+
+    def _acquire(self):
+        """Return an idle (driver, pages) slot, starting a browser while below `size`.
+
+        Blocks until a browser is returned or a slot frees up.
+        """
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._start(), 0
+        except Exception:
+            self._free_slot()
+            raise
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    @contextmanager
+    def driver(self):
+        """Borrow a healthy browser for one page load."""
+        driver, pages = self._acquire()
+        try:
+            if not self.is_healthy(driver):
+                logging.warning("Browser stopped responding, starting a new one.")
+                self._discard(driver)
+                driver, pages = self._start(), 0
+        except Exception:
+            self._free_slot()
+            raise
+
+        retire = False
+        try:
+            yield driver
+        except self.retire_on:
+            retire = True
+            raise
+        finally:
+            pages += 1
+            if retire or pages >= self.max_pages:
+                # Long-lived browsers accumulate memory; replace this one on its next loan
+                self._discard(driver)
+                self._free_slot(recycled=True)
+            else:
+                with self._available:
+                    self._idle.append((driver, pages))
+                    self._available.notify()
+
+    def stats(self):
+        with self._available:
+            return {'size': self.size, 'started': self.started, 'recycled': self.recycled}
+
+    def close(self):
+        """Quit every browser the pool started."""
+        with self._available:
+            drivers = list(self._all)
+        for driver in drivers:
+            self._discard(driver)
+        with self._available:
+            self._idle.clear()
+            self._created = 0
+            self._available.notify_all()
@@ -1,15 +1,108 @@
 import aiohttp
+import argparse
 import asyncio
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+import soupsieve
 import csv
-import random
+import time
 from fake_useragent import UserAgent
 from datetime import datetime
 import os
+import re
+from functools import partial
+from http_session import AdaptiveConcurrency, create_session, DEFAULT_LIMIT_PER_HOST
+from checkpoint import ScrapeCheckpoint
+from http_cache import fetch_cached_async, get_default_cache
+from html_parsing import class_pattern, make_soup
+from parse_pool import ParseBatcher
+from concurrent.futures import ProcessPoolExecutor
+from rate_limit import get_rate_limiter, rate_limit_stats
+from dedupe import ItemDeduper, SeenStore, canonical_item_id
+from pagination import AdaptivePagination
+from recrawl import PriceHistory, RecrawlScheduler
+from retry import get_retry_policy
+from spec_cache import SpecCache
+import structured_data
+from structured_data import product_data
+
+# Search endpoint; the benchmark points it at the local mock marketplace
+EBAY_SEARCH_URL = "https://www.ebay.com/sch/i.html"
+
+# Output of --recrawl runs, which recheck a sample of known items rather than whole categories
+RECRAWL_DIRECTORY = "data/raw/ebay_recrawl"
+
+# Category names and their search queries
+CATEGORIES = {
+    "Laptops": "laptop",
+    "Monitors": "monitor",
+    "Smart Watches": "smart watch",
+    "Graphics Cards": "graphics card"
+}
 
 # Initialize UserAgent for rotating headers
 ua = UserAgent()
 
+PRODUCT_PAGE_STRAINER = SoupStrainer(['h1', 'div'], class_=class_pattern(
+    'x-item-title__mainTitle', 'x-price-primary', 'ux-labels-values__labels', 'ux-labels-values__values'
+))
+# Item specifics only, for pages whose title and price come from JSON-LD
+SPECS_STRAINER = SoupStrainer('div', class_=class_pattern('ux-labels-values__labels', 'ux-labels-values__values'))
+SEARCH_PAGE_STRAINER = SoupStrainer('div', class_=class_pattern('s-item__wrapper'))
+
+# How eBay's item pages write JSON-LD currencies ("US $1,299.99", "GBP 12.99" otherwise)
+CURRENCY_PREFIXES = {'USD': 'US $', 'CAD': 'C $', 'AUD': 'AU $'}
+# A bare dollar sign on a search card, which item pages write as "US $"
+BARE_DOLLAR_RE = re.compile(r'(?<![A-Z])(?<![A-Z] )\$')
+
+# Selectors are compiled once instead of on every page
+TITLE_SELECTOR = soupsieve.compile('h1.x-item-title__mainTitle')
+PRICE_SELECTOR = soupsieve.compile('div.x-price-primary')
+SPEC_LABEL_SELECTOR = soupsieve.compile('div.ux-labels-values__labels')
+ITEM_SELECTOR = soupsieve.compile('div.s-item__wrapper')
+ITEM_LINK_SELECTOR = soupsieve.compile('a.s-item__link')
+CARD_TITLE_SELECTOR = soupsieve.compile('.s-item__title')
+CARD_PRICE_SELECTOR = soupsieve.compile('.s-item__price')
+
+# Output fields per category and the eBay item-specifics label each one is read from
+CATEGORY_SPECS = {
+    "Laptops": {
+        'RAM': 'RAM Size',
+        'CPU': 'Processor',
+        'Model': 'Model',
+        'Brand': 'Brand',
+        'GPU': 'GPU',
+        'Screen Size': 'Screen Size',
+        'Storage': 'SSD Capacity',
+    },
+    "Monitors": {
+        'Screen Size': 'Screen Size',
+        'Maximum Resolution': 'Resolution',
+        'Aspect Ratio': 'Aspect Ratio',
+        'Refresh Rate': 'Refresh Rate',
+        'Response Time': 'Response Time',
+        'Brand': 'Brand',
+        'Model': 'Model',
+    },
+    "Smart Watches": {
+        'Case Size': 'Case Size',
+        'Battery Capacity': 'Battery Capacity',
+        'Brand': 'Brand',
+        'Model': 'Model',
+        'Operating System': 'Operating System',
+        'Storage Capacity': 'Storage Capacity',
+    },
+    "Graphics Cards": {
+        'Brand': 'Brand',
+        'Memory Size': 'Memory Size',
+        'Memory Type': 'Memory Type',
+        'Chipset/GPU Model': 'Chipset/GPU Model',
+        'Connectors': 'Connectors',
+    },
+}
+
+# Fields read from a search result card; the rest of a record comes from the item page
+CARD_FIELDS = ('Title', 'Price', 'Collection Date')
+
 # Define headers with rotating User-Agent
 def get_headers():
     return {
@@ -22,117 +115,287 @@ def get_headers():
         'DNT': '1'
     }
 
-async def scrape_product_details(session, product_url, category):
+async def fetch_html(session, url, limiter, params=None, cache=None):
+    """GET a page (through the response cache if given) inside a concurrency slot and
+    report its status and latency to the limiter. Transient errors are retried with
+    backoff by the shared retry policy, outside the slot. The rate-limit token is
+    awaited before taking the slot, so the latency reported covers the request only."""
+    async def attempt():
+        if cache is None or not cache.replay:
+            await get_rate_limiter(url).acquire_async()
+        async with limiter:
+            start = time.monotonic()
+            try:
+                status, html = await fetch_cached_async(session, url, get_headers(), cache, params)
+            except aiohttp.ClientResponseError as e:
+                limiter.record(e.status, time.monotonic() - start)
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                limiter.record(None, time.monotonic() - start)
+                raise
+            limiter.record(200 if status == 304 else status, time.monotonic() - start)
+            return html
+
+    return await get_retry_policy().call_async(attempt)
+
+def parse_product_page(html, category):
+    """Extract the title, price and category-specific specs from an item page.
+
+    Title, price, brand and model are read from the page's JSON-LD Product when it
+    has a name and price, and so are the item specifics it lists. Only when the
+    category needs a label that the JSON-LD lacks is the item-specifics subtree of
+    the DOM parsed as well. Pages without usable JSON-LD are parsed from the DOM.
+    """
+    labels = CATEGORY_SPECS.get(category, {})
+    data = product_data(html) if structured_data.ENABLED else None
+    if data and data['name'] and data['price']:
+        specs = dict(data['properties'])
+        for label, value in (('Brand', data['brand']), ('Model', data['model'])):
+            if value:
+                specs.setdefault(label, value)
+        if not all(label in specs for label in labels.values()):
+            for label, value in parse_item_specifics(make_soup(html, SPECS_STRAINER)).items():
+                specs.setdefault(label, value)
+        return build_product_details(data['name'], format_price(data['price'], data['currency']), specs, category)
+
+    soup = make_soup(html, PRODUCT_PAGE_STRAINER)
+
+    title = TITLE_SELECTOR.select_one(soup)
+    title = title.text.strip() if title else 'N/A'
+
+    price = PRICE_SELECTOR.select_one(soup)
+    price = price.text.strip() if price else 'N/A'
+
+    return build_product_details(title, price, parse_item_specifics(soup), category)
+
+def format_price(amount, currency):
+    """Write a JSON-LD price the way the item page's price node shows it."""
+    try:
+        amount = f"{float(amount):,.2f}"
+    except ValueError:
+        pass
+    if not currency:
+        return amount
+    prefix = CURRENCY_PREFIXES.get(currency, f"{currency} ")
+    return f"{prefix}{amount}"
+
+def parse_item_specifics(soup):
+    """Map the item-specifics labels of a parsed item page to their values."""
+    specs = {}
+    for spec in SPEC_LABEL_SELECTOR.select(soup):
+        key = spec.text.strip()
+        value = spec.find_next('div', class_='ux-labels-values__values').text.strip()
+        specs[key] = value
+    return specs
+
+def build_product_details(title, price, specs, category):
+    """Assemble the output record from item specifics keyed by their eBay labels."""
+    product_details = {
+        'Title': title,
+        'Price': price,
+        'Collection Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    for field, label in CATEGORY_SPECS.get(category, {}).items():
+        product_details[field] = specs.get(label, 'N/A')
+    return product_details
+
+async def scrape_product_details(session, product_url, category, limiter, cache=None, parser=None):
     try:
-        await asyncio.sleep(random.uniform(2, 5))
-        headers = get_headers()
-
-        async with session.get(product_url, headers=headers) as response:
-            response.raise_for_status()
-            soup = BeautifulSoup(await response.text(), 'html.parser')
-
-            title = soup.find('h1', class_='x-item-title__mainTitle')
-            title = title.text.strip() if title else 'N/A'
-
-            price = soup.find('div', class_='x-price-primary')
-            price = price.text.strip() if price else 'N/A'
-
-            specs = {}
-            for spec in soup.find_all('div', class_='ux-labels-values__labels'):
-                key = spec.text.strip()
-                value = spec.find_next('div', class_='ux-labels-values__values').text.strip()
-                specs[key] = value
-
-            product_details = {
-                'Title': title,
-                'Price': price,
-                'Collection Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-
-            if category == "Laptops":
-                product_details.update({
-                    'RAM': specs.get('RAM Size', 'N/A'),
-                    'CPU': specs.get('Processor', 'N/A'),
-                    'Model': specs.get('Model', 'N/A'),
-                    'Brand': specs.get('Brand', 'N/A'),
-                    'GPU': specs.get('GPU', 'N/A'),
-                    'Screen Size': specs.get('Screen Size', 'N/A'),
-                    'Storage': specs.get('SSD Capacity', 'N/A'),
-                })
-            elif category == "Monitors":
-                product_details.update({
-                    'Screen Size': specs.get('Screen Size', 'N/A'),
-                    'Maximum Resolution': specs.get('Resolution', 'N/A'),
-                    'Aspect Ratio': specs.get('Aspect Ratio', 'N/A'),
-                    'Refresh Rate': specs.get('Refresh Rate', 'N/A'),
-                    'Response Time': specs.get('Response Time', 'N/A'),
-                    'Brand': specs.get('Brand', 'N/A'),
-                    'Model': specs.get('Model', 'N/A'),
-                })
-            elif category == "Smart Watches":
-                product_details.update({
-                    'Case Size': specs.get('Case Size', 'N/A'),
-                    'Battery Capacity': specs.get('Battery Capacity', 'N/A'),
-                    'Brand': specs.get('Brand', 'N/A'),
-                    'Model': specs.get('Model', 'N/A'),
-                    'Operating System': specs.get('Operating System', 'N/A'),
-                    'Storage Capacity': specs.get('Storage Capacity', 'N/A')
-                })
-            elif category == "Graphics Cards":
-                product_details.update({
-                    'Brand': specs.get('Brand', 'N/A'),
-                    'Memory Size': specs.get('Memory Size', 'N/A'),
-                    'Memory Type': specs.get('Memory Type', 'N/A'),
-                    'Chipset/GPU Model': specs.get('Chipset/GPU Model', 'N/A'),
-                    'Connectors': specs.get('Connectors', 'N/A')
-                })
-
-            print(f"Successfully scraped {category}: {title[:50]}...")
-            return product_details
+        html = await fetch_html(session, product_url, limiter, cache=cache)
+
+        parser = parser or ParseBatcher()
+        product_details = await parser.parse(parse_product_page, html, category)
+        print(f"Successfully scraped {category}: {product_details['Title'][:50]}...")
+        return product_details
 
     except Exception as e:
         print(f"Error scraping {product_url}: {str(e)}")
         return None
 
-async def scrape_search_page(session, query, page, semaphore, category):
-    async with semaphore:
-        try:
-            base_url = "https://www.ebay.com/sch/i.html"
-            params = {'_nkw': query, '_sacat': 0, '_from': 'R40', '_pgn': page}
-
-            headers = get_headers()
-            async with session.get(base_url, params=params, headers=headers) as response:
-                response.raise_for_status()
-                soup = BeautifulSoup(await response.text(), 'html.parser')
+def parse_search_page(html):
+    """Return the result cards of a search page as dicts with the item's url, title and price."""
+    soup = make_soup(html, SEARCH_PAGE_STRAINER)
+    cards = []
+    for item in ITEM_SELECTOR.select(soup):
+        link = ITEM_LINK_SELECTOR.select_one(item)
+        if link:
+            title = CARD_TITLE_SELECTOR.select_one(item)
+            price = CARD_PRICE_SELECTOR.select_one(item)
+            cards.append({
+                'url': link['href'],
+                'title': title.get_text(' ', strip=True).removeprefix('New Listing ').strip() if title else 'N/A',
+                'price': BARE_DOLLAR_RE.sub('US $', price.get_text(' ', strip=True)) if price else 'N/A',
+            })
+    return cards
+
+async def scrape_search_page(session, query, page, limiter, category, cache=None, parser=None):
+    """Return the result cards of one search page, or None if the page fails to load."""
+    try:
+        base_url = EBAY_SEARCH_URL
+        params = {'_nkw': query, '_sacat': 0, '_from': 'R40', '_pgn': page}
 
-                items = soup.find_all('div', class_='s-item__wrapper')
-                product_urls = [item.find('a', class_='s-item__link')['href'] for item in items if item.find('a', class_='s-item__link')]
+        html = await fetch_html(session, base_url, limiter, params=params, cache=cache)
 
-                print(f"Scraped page {page} for {category} ({len(product_urls)} products)")
-                return product_urls
+        parser = parser or ParseBatcher()
+        cards = await parser.parse(parse_search_page, html)
 
-        except Exception as e:
-            print(f"Error scraping page {page} for {category}: {str(e)}")
-            return []
+        print(f"Scraped page {page} for {category} ({len(cards)} products)")
+        return cards
 
-async def scrape_ebay_search(categories, max_pages=1):
-    all_products = {}
-    semaphore = asyncio.Semaphore(2)
+    except Exception as e:
+        print(f"Error scraping page {page} for {category}: {str(e)}")
+        return None
 
-    async with aiohttp.ClientSession() as session:
-        for category, query in categories.items():
-            print(f"\n{'=' * 30}\nStarting {category} scraping\n{'=' * 30}")
-            tasks = [scrape_search_page(session, query, page, semaphore, category) for page in range(1, max_pages + 1)]
+async def scrape_ebay_search(categories, max_pages=1, max_concurrency=DEFAULT_LIMIT_PER_HOST, num_workers=8,
+                             checkpoints=None, cache=None, parse_executor=None, deduper=None,
+                             listing_only=False, spec_cache=None, history=None):
+    """Scrape all categories through one pipeline: search pages feed product URLs to a
+    fixed pool of detail workers, and every request shares one adaptive concurrency budget.
+
+    With `listing_only`, records come from the search result cards plus the specs in
+    `spec_cache`, and item pages are fetched only for items it lacks.
+    """
+    checkpoints = checkpoints or {}
+    all_products = {category: [] for category in categories}
+    product_counts = {category: 0 for category in categories}
+    parser = ParseBatcher(parse_executor)
+    deduper = deduper or ItemDeduper()
+    limiter = AdaptiveConcurrency(initial=min(4, max_concurrency), maximum=max_concurrency)
+    url_queue = asyncio.Queue(maxsize=num_workers * 4)
+    listed = set()
+
+    def save(category, url, product, fetched=False):
+        """Keep a record; an item whose page was `fetched` is marked as such once the record is safe."""
+        product_counts[category] += 1
+        if history is not None:
+            history.record(canonical_item_id(url), url, category, product['Price'])
+        on_saved = partial(deduper.mark_fetched, url) if fetched else None
+        if category in checkpoints:
+            checkpoints[category].add(product, url=canonical_item_id(url) or url, on_saved=on_saved)
+        else:
+            all_products[category].append(product)
+            if on_saved is not None:
+                on_saved()
+
+    def card_ids(cards):
+        return [canonical_item_id(card['url']) or card['url'] for card in cards]
+
+    async def crawl(category, query):
+        pagination = AdaptivePagination(max_pages)
+
+        def fetch_page(page):
+            return scrape_search_page(session, query, page, limiter, category, cache, parser)
+
+        async for _, cards in pagination.pages_async(fetch_page, card_ids):
+            await produce(category, cards)
+        print(f"Stopped {category} search: {pagination.stop_reason} ({pagination.stats()})")
+
+    async def produce(category, cards):
+        checkpoint = checkpoints.get(category)
+        for card in cards:
+            url = card['url']
+            item_id = canonical_item_id(url) or url
+            if checkpoint and checkpoint.is_url_done(item_id):
+                continue
+            if listing_only:
+                # Prices are observed on every run, so only in-run duplicates are skipped
+                if item_id in listed:
+                    continue
+                listed.add(item_id)
+                specs = spec_cache.get(item_id) if spec_cache is not None else {}
+                if specs is not None:
+                    save(category, url, {
+                        'Title': card['title'],
+                        'Price': card['price'],
+                        'Collection Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        **specs,
+                    })
+                    continue
+            elif not deduper.should_fetch(url):
+                continue
+            await url_queue.put((category, url))
 
-            search_results = await asyncio.gather(*tasks)
-            product_urls = [url for sublist in search_results for url in sublist]
+    async def consume():
+        while True:
+            category, url = await url_queue.get()
+            try:
+                product = await scrape_product_details(session, url, category, limiter, cache, parser)
+                if product:
+                    if spec_cache is not None and canonical_item_id(url):
+                        spec_cache.put(canonical_item_id(url),
+                                       {key: value for key, value in product.items() if key not in CARD_FIELDS})
+                    save(category, url, product, fetched=True)
+            finally:
+                url_queue.task_done()
+
+    async with create_session(limit_per_host=max_concurrency) as session:
+        print(f"\n{'=' * 30}\nStarting scraping of {', '.join(categories)}\n{'=' * 30}")
+        workers = [asyncio.create_task(consume()) for _ in range(num_workers)]
+
+        # Categories are crawled side by side so every one starts feeding the workers early
+        await asyncio.gather(*(crawl(category, query) for category, query in categories.items()))
+        await url_queue.join()
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    print(f"Final concurrency limit: {limiter.limit}")
+    print(f"Request rate: {rate_limit_stats()}")
+    print(f"Deduplication: {deduper.stats()}")
+    if history is not None:
+        print(f"Price history: {history.stats()}")
+    if spec_cache is not None:
+        print(f"Spec cache: {spec_cache.stats()}")
+    print(f"Retries: {get_retry_policy().stats()}")
+    if cache is not None:
+        print(f"HTTP cache: {cache.stats()}")
+    for category, count in product_counts.items():
+        if category in checkpoints:
+            checkpoints[category].flush()
+        print(f"\n{'=' * 30}\nCompleted {category} ({count} items)\n{'=' * 30}")
 
-            product_tasks = [scrape_product_details(session, url, category) for url in product_urls]
-            products = await asyncio.gather(*product_tasks)
+    return all_products
 
-            all_products[category] = [p for p in products if p]
-            print(f"\n{'=' * 30}\nCompleted {category} ({len(all_products[category])} items)\n{'=' * 30}")
+async def recrawl_ebay(planned, max_concurrency=DEFAULT_LIMIT_PER_HOST, checkpoints=None, cache=None,
+                       parse_executor=None, history=None):
+    """Re-fetch the item pages chosen by a RecrawlScheduler and record their current prices.
 
+    `planned` holds the (item_id, url, category, probability) tuples returned by
+    RecrawlScheduler.plan(). Records go to the category's checkpoint in `checkpoints`
+    when there is one, and are returned per category otherwise.
+    """
+    checkpoints = checkpoints or {}
+    all_products = {}
+    changed = 0
+    parser = ParseBatcher(parse_executor)
+    limiter = AdaptiveConcurrency(initial=min(4, max_concurrency), maximum=max_concurrency)
+
+    async def recheck(item_id, url, category):
+        nonlocal changed
+        checkpoint = checkpoints.get(category)
+        if checkpoint and checkpoint.is_url_done(item_id):
+            return
+        product = await scrape_product_details(session, url, category, limiter, cache, parser)
+        if not product:
+            return
+        if history is not None and history.record(item_id, url, category, product['Price']):
+            changed += 1
+        if checkpoint:
+            checkpoint.add(product, url=item_id)
+        else:
+            all_products.setdefault(category, []).append(product)
+
+    async with create_session(limit_per_host=max_concurrency) as session:
+        print(f"\n{'=' * 30}\nRechecking {len(planned)} items\n{'=' * 30}")
+        await asyncio.gather(*(recheck(item_id, url, category) for item_id, url, category, _ in planned))
+
+    expected = sum(probability for *_, probability in planned)
+    print(f"Price changes found: {changed} (expected {expected:.1f})")
+    print(f"Request rate: {rate_limit_stats()}")
+    print(f"Retries: {get_retry_policy().stats()}")
+    for checkpoint in checkpoints.values():
+        checkpoint.flush()
     return all_products
 
 def get_next_scrape_number(save_directory, category):
@@ -149,21 +412,24 @@ def get_next_scrape_number(save_directory, category):
                 continue
     return scrape_number
 
-def save_to_csv(data, category, save_directory, fieldnames):
-    # Format category name for folder and filename
-    category_folder = category.lower().replace(' ', '_')
-    category_filename = category_folder
-    today_date = datetime.now().strftime('%Y_%m_%d')
-
-    # Create the category folder if it doesn't exist
-    category_directory = os.path.join(save_directory, category_folder)
+def get_category_directory(category, save_directory):
+    """Return (and create) the folder holding a category's CSV files."""
+    category_directory = os.path.join(save_directory, category.lower().replace(' ', '_'))
     os.makedirs(category_directory, exist_ok=True)
+    return category_directory
+
+def get_output_path(category, save_directory):
+    """Build the next versioned CSV path for a category."""
+    category_filename = category.lower().replace(' ', '_')
+    today_date = datetime.now().strftime('%Y_%m_%d')
+    category_directory = get_category_directory(category, save_directory)
 
     # Determine the next scrape number globally
     scrape_number = get_next_scrape_number(category_directory, category_filename)
+    return os.path.join(category_directory, f"{category_filename}_{today_date}_scrape{scrape_number}.csv")
 
-    # Generate filename
-    filename = os.path.join(category_directory, f"{category_filename}_{today_date}_scrape{scrape_number}.csv")
+def save_to_csv(data, category, save_directory, fieldnames):
+    filename = get_output_path(category, save_directory)
 
     # Save data to CSV
     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -173,19 +439,13 @@ def save_to_csv(data, category, save_directory, fieldnames):
 
     print(f"Saved {len(data)} {category} items to {filename}")
 
-async def main():
-    categories = {
-        "Laptops": "laptop",
-        "Monitors": "monitor",
-        "Smart Watches": "smart watch",
-        "Graphics Cards": "graphics card"
-    }
+async def main(listing_only=False, recrawl_budget=None):
+    categories = CATEGORIES
 
+    # Upper bound only; categories stop as soon as their pages run out of new items
     max_pages = 18
-    save_directory = "data/raw/ebay"
-
-    print("\nStarting eBay scraping...")
-    all_products = await scrape_ebay_search(categories, max_pages)
+    # Recrawls recheck a sample of items, so they are kept apart from the full snapshots the cleaning scripts read
+    save_directory = RECRAWL_DIRECTORY if recrawl_budget else "data/raw/ebay"
 
     category_fields = {
         "Laptops": ['Title', 'Price', 'RAM', 'CPU', 'Model', 'Brand', 'GPU', 'Screen Size', 'Storage', 'Collection Date'],
@@ -194,9 +454,50 @@ async def main():
         "Graphics Cards": ['Title', 'Price', 'Brand', 'Memory Size', 'Memory Type', 'Chipset/GPU Model', 'Connectors', 'Collection Date']
     }
 
-    for category, products in all_products.items():
-        if products:
-            save_to_csv(products, category, save_directory, category_fields[category])
+    # Stream each category to disk so an interrupted run can resume where it stopped
+    today_date = datetime.now().strftime('%Y_%m_%d')
+    checkpoints = {
+        category: ScrapeCheckpoint(
+            get_category_directory(category, save_directory),
+            f"{category.lower().replace(' ', '_')}_{today_date}",
+            fieldnames=category_fields[category],
+        )
+        for category in categories
+    }
+
+    history = PriceHistory()
+    if recrawl_budget:
+        print(f"\nRechecking eBay prices (budget {recrawl_budget} items)...")
+        planned = [entry for entry in RecrawlScheduler(history, recrawl_budget).plan('ebay') if entry[2] in categories]
+        try:
+            with ProcessPoolExecutor() as parse_executor:
+                await recrawl_ebay(planned, checkpoints=checkpoints, cache=get_default_cache(),
+                                   parse_executor=parse_executor, history=history)
+        finally:
+            history.close()
+    else:
+        print("\nStarting eBay scraping...")
+        seen_store = SeenStore()
+        spec_cache = SpecCache()
+        try:
+            with ProcessPoolExecutor() as parse_executor:
+                await scrape_ebay_search(categories, max_pages, checkpoints=checkpoints, cache=get_default_cache(),
+                                         parse_executor=parse_executor, deduper=ItemDeduper(seen_store),
+                                         listing_only=listing_only, spec_cache=spec_cache, history=history)
+        finally:
+            seen_store.close()
+            spec_cache.close()
+            history.close()
+
+    for category, checkpoint in checkpoints.items():
+        checkpoint.finalize(get_output_path(category, save_directory))
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="Scrape eBay search results and item pages.")
+    arg_parser.add_argument('--listing-only', action='store_true',
+                            help="take title and price from search results; fetch item pages only for uncached specs")
+    arg_parser.add_argument('--recrawl', type=int, metavar='BUDGET',
+                            help="instead of searching, recheck the BUDGET known items most likely to have changed "
+                                 f"price; records go to {RECRAWL_DIRECTORY}")
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.listing_only, args.recrawl))
\ No newline at end of file
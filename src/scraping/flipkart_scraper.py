@@ -1,11 +1,28 @@
+import argparse
+import multiprocessing
 import os
-import time
+from functools import partial
+import queue
 import random
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import SoupStrainer
 from datetime import datetime
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from checkpoint import ScrapeCheckpoint
+from http_cache import CacheMiss, fetch_cached, get_default_cache
+from html_parsing import class_pattern, make_soup
+from rate_limit import get_rate_limiter, install_rate_limiter, rate_limit_stats, share_rate_limiter
+from dedupe import ItemDeduper, SeenStore, canonical_item_id
+from pagination import AdaptivePagination
+from recrawl import PriceHistory, RecrawlScheduler
+from retry import get_retry_policy
+from spec_cache import SpecCache
+import structured_data
+from structured_data import product_data
 
 # Constants
 USER_AGENTS = [
@@ -18,17 +35,59 @@ DEFAULT_HEADERS = {
     'Accept-Language': 'en-US, en;q=0.5'
 }
 
+# Site root used to build product URLs; the benchmark points it at the local mock marketplace
+FLIPKART_BASE_URL = "https://www.flipkart.com"
+
+# Category listing URLs and the most pages read from each (fewer once a category runs out of new products)
+CATEGORIES = {
+    "graphics_cards": {
+        "url": "https://www.flipkart.com/gaming-components/graphic-cards/pr?sid=4rr,tin,6zn&q=graphics+card&otracker=categorytree",
+        "num_pages": 18
+    },
+    "laptops": {
+        "url": "https://www.flipkart.com/laptops/pr?sid=6bo,b5g&q=laptop&otracker=categorytree",
+        "num_pages": 18
+    },
+    "monitors": {
+        "url": "https://www.flipkart.com/search?q=monitor&otracker=search&otracker1=search&marketplace=FLIPKART&as-show=on&as=off",
+        "num_pages": 18
+    },
+    "smart_watches": {
+        "url": "https://www.flipkart.com/wearable-smart-devices/smart-watches/pr?sid=ajy,buh&q=smart+watches&otracker=categorytree",
+        "num_pages": 18
+    }
+}
+
+# Product pages fetched at the same time for one listing page
+DETAIL_WORKERS = 8
+
+# Output of --recrawl runs, which recheck a sample of known products rather than whole categories
+RECRAWL_DIRECTORY = "data/raw/flipkart_recrawl"
+
+# Product-page fields the listing card also shows; they change often, so only the specifications are cached
+CARD_FIELDS = ('rating', 'reviews')
+
+PRODUCT_PAGE_STRAINER = SoupStrainer(class_=class_pattern('GNDEQ-', '_3LWZlK', '_2_R_DZ'))
+LISTING_PAGE_STRAINER = SoupStrainer('div', class_=class_pattern('cPHDOP col-12-12'))
+
+_local = threading.local()
+_messages = None  # progress queue of a parallel-run worker process
+
 # Helper Functions
+def get_session():
+    """Returns this thread's pooled requests.Session, so connections are kept alive between pages."""
+    if not hasattr(_local, 'session'):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DETAIL_WORKERS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return _local.session
+
 def get_text_or_default(element, default="Data not available"):
     """Extracts text from BeautifulSoup element or returns a default value."""
     return element.text.strip() if element else default
 
-def wait_random(min_time=3, max_time=7):
-    """Wait for a random number of seconds to avoid detection."""
-    delay = random.randint(min_time, max_time)
-    print(f"Waiting {delay} seconds...")
-    time.sleep(delay)
-
 def extract_specifications(soup):
     """Extracts specifications from the product details section."""
     specifications = {}
@@ -52,48 +111,91 @@ def extract_specifications(soup):
 
     return specifications
 
-def scrape_flipkart_product(product_url):
-    """Scrapes detailed information (including ratings and reviews) for a single product."""
-    headers = DEFAULT_HEADERS
-    try:
-        response = requests.get(product_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+def parse_product_page(html):
+    """Extracts rating, review count and specifications from a product page.
+
+    The page's JSON-LD Product is used when it lists the specifications; otherwise
+    the specification tables are read from the DOM.
+    """
+    data = product_data(html) if structured_data.ENABLED else None
+    if data and data['properties']:
+        return {
+            "rating": data['rating'] or "Data not available",
+            "reviews": data['rating_count'] or "Data not available",
+            **data['properties'],
+        }
 
-        specifications = extract_specifications(soup)
+    soup = make_soup(html, PRODUCT_PAGE_STRAINER)
 
-        rating_element = soup.find('div', class_='_3LWZlK')
-        rating = get_text_or_default(rating_element)
+    specifications = extract_specifications(soup)
 
-        reviews_element = soup.find('span', class_='_2_R_DZ')
-        reviews_text = get_text_or_default(reviews_element)
+    rating_element = soup.find('div', class_='_3LWZlK')
+    rating = get_text_or_default(rating_element)
 
-        reviews_match = re.search(r'\d+', reviews_text.replace(',', ''))
-        reviews = reviews_match.group() if reviews_match else "Data not available"
+    reviews_element = soup.find('span', class_='_2_R_DZ')
+    reviews_text = get_text_or_default(reviews_element)
 
-        return {
-            "rating": rating,
-            "reviews": reviews,
-            **specifications,
-        }
+    reviews_match = re.search(r'\d+', reviews_text.replace(',', ''))
+    reviews = reviews_match.group() if reviews_match else "Data not available"
 
-    except requests.exceptions.RequestException as e:
+    return {
+        "rating": rating,
+        "reviews": reviews,
+        **specifications,
+    }
+
+def format_price(amount, currency):
+    """Write a JSON-LD price the way listing cards show it, e.g. '₹1,29,999'."""
+    if currency not in (None, 'INR'):
+        return f"{currency} {amount}"
+    try:
+        digits = str(round(float(amount)))
+    except ValueError:
+        return amount
+    # Indian grouping: the last three digits, then pairs
+    head, groups = digits[:-3], [digits[-3:]]
+    while head:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return "₹" + ",".join(groups)
+
+def scrape_flipkart_product(product_url, cache=None, spec_cache=None):
+    """Scrapes detailed information (including ratings and reviews) for a single product.
+
+    Returns None when the page cannot be fetched. Fetched specifications are stored
+    in `spec_cache` (a SpecCache) when given.
+    """
+    headers = DEFAULT_HEADERS
+    item_id = canonical_item_id(product_url) if spec_cache is not None else None
+    try:
+        _, html = get_retry_policy().call(fetch_cached, get_session(), product_url, headers, cache,
+                                          rate_limiter=get_rate_limiter(product_url))
+        details = parse_product_page(html)
+        if item_id is not None:
+            spec_cache.put(item_id, {key: value for key, value in details.items() if key not in CARD_FIELDS})
+        return details
+
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"Error occurred while scraping product {product_url}: {e}")
-        return {"rating": "Data not available", "reviews": "Data not available"}
+        return None
 
-def scrape_flipkart_page(url, category_name):
+def fetch_listing_page(url, category_name, cache=None):
+    """Download one listing page and return all of its product cards, repeats included.
+
+    Returns an empty list when the page has no products and None when it fails to load.
+    """
     headers = DEFAULT_HEADERS
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        _, html = get_retry_policy().call(fetch_cached, get_session(), url, headers, cache,
+                                          rate_limiter=get_rate_limiter(url))
+        soup = make_soup(html, LISTING_PAGE_STRAINER)
 
         product_blocks = soup.find_all('div', class_='cPHDOP col-12-12')
         if not product_blocks:
             print("No product blocks found on this page.")
             return []
 
-        scraped_items = []
+        listed_items = []
         collection_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         for product in product_blocks:
@@ -131,11 +233,9 @@ def scrape_flipkart_page(url, category_name):
             rating = get_text_or_default(rating_element)
             reviews = get_text_or_default(reviews_element)
             image_url = image_element['src'] if image_element else "Image not available"
-            product_url = f"https://www.flipkart.com{link_element['href']}" if link_element else "URL not available"
-
-            specifications = scrape_flipkart_product(product_url) if product_url != "URL not available" else {}
+            product_url = f"{FLIPKART_BASE_URL}{link_element['href']}" if link_element else "URL not available"
 
-            scraped_items.append({
+            listed_items.append({
                 "title": title,
                 "price": price,
                 "rating": rating,
@@ -143,14 +243,81 @@ def scrape_flipkart_page(url, category_name):
                 "image_url": image_url,
                 "product_url": product_url,
                 "collection_date": collection_date,
-                **specifications,
             })
 
-        return scraped_items
+        return listed_items
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"Error occurred while scraping {url}: {e}")
-        return []
+        return None
+
+def listing_item_ids(listed_items):
+    """Item IDs of the product cards returned by fetch_listing_page()."""
+    return [canonical_item_id(item["product_url"]) or item["product_url"]
+            for item in listed_items if item["product_url"] != "URL not available"]
+
+def cached_specifications(product_url, spec_cache):
+    """Specifications stored in `spec_cache` for a product within its TTL, or None."""
+    item_id = canonical_item_id(product_url) if spec_cache is not None else None
+    specifications = spec_cache.get(item_id) if item_id is not None else None
+    if specifications is None:
+        return None
+    # The listing card's current rating and review count are kept
+    return {key: value for key, value in specifications.items() if key not in CARD_FIELDS}
+
+def scrape_listed_items(listed_items, skip_urls=(), cache=None, deduper=None, executor=None, spec_cache=None):
+    """Complete the product cards of a listing page with their product-page details.
+
+    Products whose item ID is in `skip_urls`, or that `deduper` says were already
+    fetched, are left out. With an `executor` (a ThreadPoolExecutor) the product pages
+    are fetched concurrently, bounded by its worker count; otherwise one at a time.
+    Products with fresh details in `spec_cache` are not fetched again.
+
+    Returns (item, fetched) pairs in listing order; `fetched` is True only when the
+    product page was downloaded.
+    """
+    scraped_items = []
+    for item in listed_items:
+        product_url = item["product_url"]
+        if product_url != "URL not available":
+            # Skip products already saved by an interrupted run or fetched recently
+            if (canonical_item_id(product_url) or product_url) in skip_urls:
+                continue
+            if deduper is not None and not deduper.should_fetch(product_url):
+                continue
+        scraped_items.append(item)
+
+    def fetch_details(item):
+        product_url = item["product_url"]
+        if product_url == "URL not available":
+            return {}, False
+        specifications = cached_specifications(product_url, spec_cache)
+        if specifications is not None:
+            return specifications, False
+        specifications = scrape_flipkart_product(product_url, cache, spec_cache)
+        if specifications is None:
+            return {"rating": "Data not available", "reviews": "Data not available"}, False
+        return specifications, True
+
+    # Detail pages do not depend on each other; results keep the listing order
+    details = executor.map(fetch_details, scraped_items) if executor is not None else map(fetch_details, scraped_items)
+    results = []
+    for item, (specifications, fetched) in zip(scraped_items, details):
+        item.update(specifications)
+        results.append((item, fetched))
+
+    return results
+
+def scrape_flipkart_page(url, category_name, skip_urls=(), cache=None, deduper=None, executor=None,
+                         spec_cache=None):
+    """Scrape one listing page; returns None when the page has no products or fails to load.
+
+    See scrape_listed_items() for how products are filtered and completed.
+    """
+    listed_items = fetch_listing_page(url, category_name, cache)
+    if not listed_items:
+        return None
+    return [item for item, _ in scrape_listed_items(listed_items, skip_urls, cache, deduper, executor, spec_cache)]
 
 def get_next_scrape_number(output_dir, category_name):
     """Determine the next scrape number globally, regardless of the date."""
@@ -166,64 +333,206 @@ def get_next_scrape_number(output_dir, category_name):
                 continue
     return scrape_number
 
-def scrape_flipkart(category_url, num_pages, category_name, output_dir="data/raw/flipkart"):
-
-    aggregated_results = []
-    for page in range(1, num_pages + 1):
-        print(f"Scraping page {page}...")
-        page_url = f"{category_url}&page={page}"
-        page_results = scrape_flipkart_page(page_url, category_name)
-
-        if not page_results:
-            print("No more products found. Stopping.")
-            break
-
-        aggregated_results.extend(page_results)
-        wait_random()
-
-    if aggregated_results:
-        today = datetime.today()
-        formatted_date = today.strftime("%Y_%m_%d")
-
-        # Create category-specific directory
-        category_directory = os.path.join(output_dir, category_name)
-        os.makedirs(category_directory, exist_ok=True)
-
-        # Determine the next scrape number globally
-        scrape_number = get_next_scrape_number(category_directory, category_name)
-
-        filename = f"{category_name}_{formatted_date}_scrape{scrape_number}.csv"
-        output_path = os.path.join(category_directory, filename)
-
-        df = pd.DataFrame(aggregated_results)
-        df.to_csv(output_path, index=False, encoding='utf-8-sig')
-        print(f"Data saved to {output_path}")
-    else:
-        print("No data scraped.")
+def scrape_flipkart(category_url, num_pages, category_name, output_dir="data/raw/flipkart", cache=None,
+                    deduper=None, detail_workers=DETAIL_WORKERS, progress=print, spec_cache=None, history=None):
+    """Scrape a category page by page, streaming records to disk through a resumable checkpoint."""
+    deduper = deduper or ItemDeduper()
+    # Create category-specific directory
+    category_directory = os.path.join(output_dir, category_name)
+    os.makedirs(category_directory, exist_ok=True)
+
+    formatted_date = datetime.today().strftime("%Y_%m_%d")
+    checkpoint = ScrapeCheckpoint(category_directory, f"{category_name}_{formatted_date}")
+    executor = ThreadPoolExecutor(max_workers=detail_workers) if detail_workers > 1 else None
+
+    # Resume after the last page finished by an interrupted run
+    first_page = 1
+    while checkpoint.is_page_done(first_page):
+        first_page += 1
+    if first_page > 1:
+        progress(f"Pages 1-{first_page - 1} already scraped, skipping.")
+
+    def fetch_page(page):
+        progress(f"Fetching listing page {page}...")
+        return fetch_listing_page(f"{category_url}&page={page}", category_name, cache)
+
+    # Listing pages are fetched a few ahead of the one whose products are being scraped
+    pagination = AdaptivePagination(num_pages, first_page=first_page)
+    with ThreadPoolExecutor(max_workers=pagination.window) as listing_executor:
+        for page, listed_items in pagination.pages(fetch_page, listing_item_ids, listing_executor):
+            if history is not None:
+                for item in listed_items:
+                    history.record(canonical_item_id(item["product_url"]), item["product_url"], category_name,
+                                   item["price"])
+
+            page_results = scrape_listed_items(listed_items, skip_urls=checkpoint.urls_done, cache=cache,
+                                               deduper=deduper, executor=executor, spec_cache=spec_cache)
+            for item, fetched in page_results:
+                url = item["product_url"]
+                item_key = (canonical_item_id(url) or url) if url != "URL not available" else None
+                checkpoint.add(item, url=item_key, on_saved=partial(deduper.mark_fetched, url) if fetched else None)
+            checkpoint.mark_page_done(page)
+            progress(f"Page {page}: {len(page_results)} products ({checkpoint.records_written} saved)")
+    if pagination.stop_reason:
+        progress(f"Stopped: {pagination.stop_reason}")
+
+    if executor is not None:
+        executor.shutdown()
+
+    # Determine the next scrape number globally
+    scrape_number = get_next_scrape_number(category_directory, category_name)
+
+    filename = f"{category_name}_{formatted_date}_scrape{scrape_number}.csv"
+    output_path = os.path.join(category_directory, filename)
+    count = checkpoint.finalize(output_path, encoding='utf-8-sig')
+    if not count:
+        progress("No data scraped.")
+
+    return count
+
+def recrawl_flipkart(planned, output_dir=RECRAWL_DIRECTORY, cache=None, history=None, spec_cache=None,
+                     detail_workers=DETAIL_WORKERS):
+    """Re-fetch the product pages chosen by a RecrawlScheduler and record their current prices.
+
+    The price comes from the page's JSON-LD offer; products without one are skipped.
+    Returns {category: records saved}.
+    """
+    def recheck(entry):
+        item_id, url, category, _ = entry
+        try:
+            _, html = get_retry_policy().call(fetch_cached, get_session(), url, DEFAULT_HEADERS, cache,
+                                              rate_limiter=get_rate_limiter(url))
+        except (requests.exceptions.RequestException, CacheMiss) as e:
+            print(f"Error occurred while rechecking {url}: {e}")
+            return None
+        data = product_data(html)
+        if not data or not data['price']:
+            print(f"No structured price on {url}")
+            return None
+        details = parse_product_page(html)
+        if spec_cache is not None:
+            spec_cache.put(item_id, {key: value for key, value in details.items() if key not in CARD_FIELDS})
+        return item_id, url, category, {
+            "title": data['name'] or "Data not available",
+            "price": format_price(data['price'], data['currency']),
+            "product_url": url,
+            "collection_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            **details,
+        }
 
-    return aggregated_results
+    formatted_date = datetime.today().strftime("%Y_%m_%d")
+    checkpoints = {category: ScrapeCheckpoint(os.path.join(output_dir, category), f"{category}_{formatted_date}")
+                   for category in {entry[2] for entry in planned}}
+    # Products saved by an interrupted recrawl are not fetched again
+    pending = [entry for entry in planned if not checkpoints[entry[2]].is_url_done(entry[0])]
+    changed = 0
+    print(f"Rechecking {len(pending)} products...")
+    with ThreadPoolExecutor(max_workers=detail_workers) as executor:
+        for result in executor.map(recheck, pending):
+            if result is None:
+                continue
+            item_id, url, category, record = result
+            if history is not None and history.record(item_id, url, category, record["price"]):
+                changed += 1
+            checkpoints[category].add(record, url=item_id)
+
+    expected = sum(probability for *_, probability in planned)
+    print(f"Price changes found: {changed} (expected {expected:.1f})")
+    counts = {}
+    for category, checkpoint in checkpoints.items():
+        category_directory = os.path.join(output_dir, category)
+        scrape_number = get_next_scrape_number(category_directory, category)
+        output_path = os.path.join(category_directory, f"{category}_{formatted_date}_scrape{scrape_number}.csv")
+        counts[category] = checkpoint.finalize(output_path, encoding='utf-8-sig')
+    return counts
+
+def _init_worker(limiter, messages):
+    """Pool initializer: share the parent's Flipkart rate limit and progress queue."""
+    global _messages
+    install_rate_limiter(urlsplit(FLIPKART_BASE_URL).netloc, limiter)
+    _messages = messages
+
+def _crawl_category(category_name, config):
+    """Worker task: scrape one category with its own cache, seen-store, spec-cache and price-history connections."""
+    seen_store = SeenStore()
+    spec_cache = SpecCache()
+    history = PriceHistory()
+    try:
+        count = scrape_flipkart(config["url"], config["num_pages"], category_name, cache=get_default_cache(),
+                                deduper=ItemDeduper(seen_store),
+                                progress=lambda message: _messages.put((category_name, message)),
+                                spec_cache=spec_cache, history=history)
+    finally:
+        seen_store.close()
+        spec_cache.close()
+        history.close()
+    return count, get_retry_policy().stats()
+
+def scrape_categories_parallel(categories):
+    """Scrape every category in its own worker process, all drawing on one Flipkart rate limit.
+
+    Workers send their progress messages to this process, which prints them as they
+    arrive. Returns {category: records saved}.
+    """
+    limiter = share_rate_limiter(FLIPKART_BASE_URL)
+    messages = multiprocessing.Queue()
+    counts = {}
+    with ProcessPoolExecutor(max_workers=len(categories), initializer=_init_worker,
+                             initargs=(limiter, messages)) as pool:
+        futures = {pool.submit(_crawl_category, name, config): name for name, config in categories.items()}
+        pending = set(futures)
+        while pending or not messages.empty():
+            try:
+                category_name, message = messages.get(timeout=0.5)
+                print(f"[{category_name}] {message}")
+            except queue.Empty:
+                pass
+            for future in [future for future in pending if future.done()]:
+                pending.discard(future)
+                category_name = futures[future]
+                try:
+                    counts[category_name], retries = future.result()
+                    print(f"[{category_name}] Finished: {counts[category_name]} records, retries {retries}")
+                except Exception as e:
+                    counts[category_name] = 0
+                    print(f"[{category_name}] Failed: {e}")
+    print(f"Request rate: {limiter.stats()}")
+    return counts
 
 # Main script
 if __name__ == "__main__":
-    categories = {
-        "graphics_cards": {
-            "url": "https://www.flipkart.com/gaming-components/graphic-cards/pr?sid=4rr,tin,6zn&q=graphics+card&otracker=categorytree",
-            "num_pages": 18
-        },
-        "laptops": {
-            "url": "https://www.flipkart.com/laptops/pr?sid=6bo,b5g&q=laptop&otracker=categorytree",
-            "num_pages": 18
-        },
-        "monitors": {
-            "url": "https://www.flipkart.com/search?q=monitor&otracker=search&otracker1=search&marketplace=FLIPKART&as-show=on&as=off",
-            "num_pages": 18
-        },
-        "smart_watches": {
-            "url": "https://www.flipkart.com/wearable-smart-devices/smart-watches/pr?sid=ajy,buh&q=smart+watches&otracker=categorytree",
-            "num_pages": 18
-        }
-    }
-
-    for category_name, config in categories.items():
-        print(f"Scraping {category_name}...")
-        scrape_flipkart(config["url"], config["num_pages"], category_name)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Flipkart category listings and product pages.")
+    parser.add_argument('--parallel', action='store_true',
+                        help="scrape each category in its own process under one shared rate limit")
+    parser.add_argument('--recrawl', type=int, metavar='BUDGET',
+                        help="recheck the prices of up to BUDGET known products instead of scraping listings")
+    args = parser.parse_args()
+
+    if args.recrawl:
+        history = PriceHistory()
+        spec_cache = SpecCache()
+        planned = [entry for entry in RecrawlScheduler(history, args.recrawl).plan('flipkart')
+                   if entry[2] in CATEGORIES]
+        recrawl_flipkart(planned, cache=get_default_cache(), history=history, spec_cache=spec_cache)
+        spec_cache.close()
+        history.close()
+        print(f"Request rate: {rate_limit_stats()}")
+        print(f"Retries: {get_retry_policy().stats()}")
+    elif args.parallel:
+        scrape_categories_parallel(CATEGORIES)
+    else:
+        cache = get_default_cache()
+        seen_store = SeenStore()
+        spec_cache = SpecCache()
+        history = PriceHistory()
+        for category_name, config in CATEGORIES.items():
+            print(f"Scraping {category_name}...")
+            scrape_flipkart(config["url"], config["num_pages"], category_name, cache=cache,
+                            deduper=ItemDeduper(seen_store), spec_cache=spec_cache, history=history)
+        seen_store.close()
+        spec_cache.close()
+        history.close()
+        print(f"Spec cache: {spec_cache.stats()}")
+        print(f"Price history: {history.stats()}")
+        print(f"Request rate: {rate_limit_stats()}")
+        print(f"Retries: {get_retry_policy().stats()}")
\ No newline at end of file
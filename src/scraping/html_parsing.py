@@ -0,0 +1,51 @@
+import importlib.util
+import os
+import re
+from bs4 import BeautifulSoup
+
+# Tree builders in order of preference; lxml is a C parser and several times faster
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+# Environment variables to override the backend or disable partial parsing
+PARSER_ENV = "SCRAPER_HTML_PARSER"
+TARGETED_ENV = "SCRAPER_TARGETED_PARSING"
+
+
+def available_backends():
+    """Return the installed tree builders, fastest first."""
+    return [name for name in PARSER_BACKENDS
+            if name == "html.parser" or importlib.util.find_spec(name) is not None]
+
+
+def resolve_backend(name=None):
+    """Pick the requested backend, falling back to the fastest one installed."""
+    name = name or os.environ.get(PARSER_ENV)
+    installed = available_backends()
+    if name and name not in installed:
+        print(f"HTML parser '{name}' is not available, using '{installed[0]}'")
+        name = None
+    return name or installed[0]
+
+
+# Module-level settings used by make_soup(); the benchmark swaps them at runtime
+BACKEND = resolve_backend()
+TARGETED = os.environ.get(TARGETED_ENV, "1") != "0"
+
+
+def class_pattern(*classes):
+    """Match tags carrying any of the given class tokens, for use in a SoupStrainer.
+
+    While parsing, a strainer sees the raw class attribute ("a b c"), so plain string
+    matching would miss tags with extra classes.
+    """
+    alternatives = '|'.join(re.escape(name) for name in classes)
+    return re.compile(rf'(?:^|\s)(?:{alternatives})(?:\s|$)')
+
+
+def make_soup(markup, parse_only=None):
+    """Parse markup with the configured backend, keeping only `parse_only` subtrees if given.
+
+    The scrapers pass a SoupStrainer matching just the elements they read, so the
+    rest of the page is tokenized but never built into a tree.
+    """
+    return BeautifulSoup(markup, BACKEND, parse_only=parse_only if TARGETED else None)
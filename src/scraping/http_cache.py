@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+# Query parameters that only carry tracking data and never change the page content
+TRACKING_PARAMS = {
+    '_trksid', '_trkparms', 'hash', 'itmmeta', 'itmprp', 'amdata', '_skw',
+    'lid', 'srno', 'otracker', 'otracker1', 'fm', 'iid', 'ppt', 'ppn', 'ssid', 'qH',
+    'spotlightTagId', 'ref_p',
+}
+
+# Cache modes
+MODE_ONLINE = "online"  # fetch from the network, revalidating cached pages
+MODE_REPLAY = "replay"  # serve only from the cache, never touch the network
+MODE_OFF = "off"        # bypass the cache entirely
+
+
+# Environment variable selecting the cache mode for the scraper entry points
+CACHE_MODE_ENV = "SCRAPER_CACHE_MODE"
+
+# Environment variable and default for how long an entry is kept since it was last
+# fetched or revalidated; 0 keeps entries forever (for building replay fixtures)
+CACHE_MAX_AGE_ENV = "SCRAPER_CACHE_MAX_AGE_DAYS"
+DEFAULT_MAX_AGE_DAYS = 14
+
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a URL has no cached response."""
+
+
+def canonical_url(url, params=None):
+    """Normalise a URL so tracking parameters and ordering do not create new cache keys."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(key, str(value)) for key, value in params.items()]
+
+    keys = {key for key, _ in query}
+    query = [
+        (key, value) for key, value in query
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+        # A Flipkart product is identified by its pid; the search query is just context
+        and not (key == 'q' and 'pid' in keys)
+    ]
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or '/',
+        urlencode(sorted(query)),
+        '',
+    ))
+
+
+class HttpCache:
+    """On-disk cache of HTML responses with ETag/Last-Modified revalidation.
+
+    Bodies are stored gzip-compressed next to a small JSON metadata file, both named
+    after the SHA-256 of the canonical URL. In online mode the cache adds conditional
+    headers to each request so an unchanged page only costs a 304; in replay mode it
+    serves cached pages and raises CacheMiss for anything else. `prune()` deletes
+    entries not fetched or revalidated within `max_age_days`.
+    """
+
+    def __init__(self, directory="data/cache/http", mode=MODE_ONLINE, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        if mode not in (MODE_ONLINE, MODE_REPLAY, MODE_OFF):
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.pruned = 0
+
+    @property
+    def enabled(self):
+        return self.mode != MODE_OFF
+
+    @property
+    def replay(self):
+        return self.mode == MODE_REPLAY
+
+    def _paths(self, url, params=None):
+        key = hashlib.sha256(canonical_url(url, params).encode('utf-8')).hexdigest()
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, f"{key}.json"), os.path.join(folder, f"{key}.html.gz")
+
+    def load(self, url, params=None):
+        """Return the cached entry (metadata plus decoded body) for a URL, or None."""
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(url, params)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            entry = json.load(f)
+        with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+            entry['body'] = f.read()
+        return entry
+
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, body, headers, params=None):
+        """Save a 200 response body with its validators."""
+        if not self.enabled:
+            return
+        meta_path, body_path = self._paths(url, params)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with gzip.open(body_path + '.tmp', 'wt', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(body_path + '.tmp', body_path)
+        self._write_meta(meta_path, {
+            'url': canonical_url(url, params),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        })
+
+    def touch(self, url, params=None):
+        """Record that a cached entry was revalidated by a 304."""
+        meta_path, _ = self._paths(url, params)
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['fetched_at'] = time.time()
+        self._write_meta(meta_path, meta)
+
+    def replay_body(self, url, params=None):
+        """Return the cached body for a URL in replay mode, raising CacheMiss if absent."""
+        entry = self.load(url, params)
+        if entry is None:
+            self.misses += 1
+            raise CacheMiss(canonical_url(url, params))
+        self.hits += 1
+        return entry['body']
+
+    def prune(self, now=None):
+        """Delete entries older than `max_age_days`; returns how many were removed."""
+        if not self.max_age_days or not os.path.isdir(self.directory):
+            return 0
+        # The metadata file is rewritten on every store and 304, so its mtime is the entry's age
+        cutoff = (time.time() if now is None else now) - self.max_age_days * 86400
+        removed = 0
+        for folder in os.scandir(self.directory):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if not entry.name.endswith('.json') or entry.stat().st_mtime >= cutoff:
+                    continue
+                for path in (entry.path, entry.path[:-len('.json')] + '.html.gz'):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        self.pruned += removed
+        return removed
+
+    def stats(self):
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses, 'pruned': self.pruned}
+
+    def _write_meta(self, meta_path, meta):
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+
+def get_default_cache(directory="data/cache/http"):
+    """Build the cache used by the scraper scripts.
+
+    The mode comes from SCRAPER_CACHE_MODE and the maximum age from
+    SCRAPER_CACHE_MAX_AGE_DAYS. Online runs prune expired entries first; replay
+    runs keep everything they may be asked to serve.
+    """
+    cache = HttpCache(directory, mode=os.environ.get(CACHE_MODE_ENV, MODE_ONLINE),
+                      max_age_days=float(os.environ.get(CACHE_MAX_AGE_ENV, DEFAULT_MAX_AGE_DAYS)))
+    if cache.mode == MODE_ONLINE:
+        cache.prune()
+    return cache
+
+
+async def fetch_cached_async(session, url, headers, cache=None, params=None, rate_limiter=None):
+    """GET a page with aiohttp through the cache; returns (status, body).
+
+    A 304 answer is turned into (304, cached body) so callers can treat it like a 200;
+    error statuses raise aiohttp.ClientResponseError. `rate_limiter` is a TokenBucket
+    acquired only when the request actually goes to the network.
+    """
+    if cache is not None and cache.replay:
+        return 200, cache.replay_body(url, params)
+
+    entry = cache.load(url, params) if cache is not None else None
+    if entry:
+        headers = {**headers, **cache.conditional_headers(entry)}
+
+    if rate_limiter is not None:
+        await rate_limiter.acquire_async()
+    async with session.get(url, params=params, headers=headers) as response:
+        if response.status == 304 and entry:
+            cache.revalidated += 1
+            cache.touch(url, params)
+            return 304, entry['body']
+        response.raise_for_status()
+        body = await response.text()
+        if cache is not None and response.status == 200:
+            cache.misses += 1
+            cache.store(url, body, response.headers, params)
+        return response.status, body
+
+
+def fetch_cached(http, url, headers, cache=None, timeout=10, rate_limiter=None):
+    """GET a page with requests (or a requests.Session) through the cache.
+
+    Returns the response-like pair (status, body) and raises requests' HTTPError for
+    error statuses, matching `raise_for_status()` in the callers. `rate_limiter` is a
+    TokenBucket acquired only when the request actually goes to the network.
+    """
+    if cache is not None and cache.replay:
+        return 200, cache.replay_body(url)
+
+    entry = cache.load(url) if cache is not None else None
+    if entry:
+        headers = {**headers, **cache.conditional_headers(entry)}
+
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    response = http.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry:
+        cache.revalidated += 1
+        cache.touch(url)
+        return 304, entry['body']
+    response.raise_for_status()
+    if cache is not None:
+        cache.misses += 1
+        cache.store(url, response.text, response.headers)
+    return response.status_code, response.text
@@ -0,0 +1,100 @@
+import asyncio
+import statistics
+import time
+import aiohttp
+
+# Connection pool defaults shared by the aiohttp scrapers
+DEFAULT_POOL_LIMIT = 32
+DEFAULT_LIMIT_PER_HOST = 8
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_DNS_TTL = 300
+DEFAULT_TIMEOUT = 30
+
+# Status codes that mean the site wants us to slow down
+BACKOFF_STATUSES = {429, 503}
+
+
+def create_session(limit=DEFAULT_POOL_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST,
+                   keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, dns_ttl=DEFAULT_DNS_TTL,
+                   timeout=DEFAULT_TIMEOUT, cookie_jar=None):
+    """Create an aiohttp session backed by a pooled, keep-alive TCP connector."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_ttl,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout),
+                                 cookie_jar=cookie_jar)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limiter.
+
+    The number of in-flight requests grows by one every `window` responses while
+    the success rate and median latency stay healthy, and is halved whenever the
+    site answers 429/503. Use it as an async context manager around a request and
+    report the outcome with `record()`.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=DEFAULT_LIMIT_PER_HOST,
+                 target_latency=3.0, min_success_rate=0.95, window=20):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.min_success_rate = min_success_rate
+        self.window = window
+        self.in_flight = 0
+        self._latencies = []
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def record(self, status, latency):
+        """Record one response (status None for a network error) and adapt the limit."""
+        now = time.monotonic()
+        if status in BACKOFF_STATUSES:
+            # Decrease at most once per target latency so one burst of 429s counts once
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._last_decrease = now
+                print(f"Backing off: concurrency limit lowered to {self.limit} (HTTP {status})")
+            self._reset_window()
+            return
+
+        self._latencies.append(latency)
+        if status is not None and 200 <= status < 300:
+            self._successes += 1
+
+        if len(self._latencies) >= self.window:
+            success_rate = self._successes / len(self._latencies)
+            median_latency = statistics.median(self._latencies)
+            if success_rate >= self.min_success_rate and median_latency <= self.target_latency:
+                if self.limit < self.maximum:
+                    self.limit += 1
+                    self._wake_waiters()
+            self._reset_window()
+
+    def _reset_window(self):
+        self._latencies = []
+        self._successes = 0
+
+    def _wake_waiters(self):
+        # record() is synchronous, so schedule the notification on the running loop
+        async def notify():
+            async with self._condition:
+                self._condition.notify_all()
+        asyncio.get_running_loop().create_task(notify())
@@ -0,0 +1,164 @@
+"""Local stand-in for eBay, Flipkart and Ubuy serving pages recorded by the HTTP cache.
+
+Each platform is served on its own port. A request for
+http://127.0.0.1:<port>/<path>?<query> is mapped back to the real site's URL and
+answered with the body the HTTP cache (see http_cache.py) stored for it; links to
+the real site are rewritten to point at the mock, so detail pages found on a search
+page are fetched from it too. Every response is delayed by a configurable latency,
+and 500 and 429 (with Retry-After) responses can be injected at given rates to
+exercise retries and the adaptive concurrency limiter.
+
+GET /__stats on any port returns request counts per status and server-side latency
+percentiles for that platform; GET /__reset clears them.
+
+Usage:
+    python src/scraping/mock_marketplace.py [--cache-dir data/cache/http] [--latency 0.2]
+        [--jitter 0.1] [--error-rate 0.0] [--throttle-rate 0.0] [--base-port 8081]
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+
+from aiohttp import web
+
+from http_cache import HttpCache
+
+# Real site served by each mock port, in port order from --base-port
+ORIGINS = {
+    "ebay": "https://www.ebay.com",
+    "flipkart": "https://www.flipkart.com",
+    "ubuy": "https://www.ubuy.ma",
+}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (q in 0-100), or None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MockMarketplace:
+    """aiohttp application per platform, answering from the recorded page cache."""
+
+    def __init__(self, cache_dir="data/cache/http", host="127.0.0.1", base_port=8081, latency=0.2,
+                 jitter=0.1, error_rate=0.0, throttle_rate=0.0, retry_after=1):
+        self.cache = HttpCache(cache_dir)
+        self.host = host
+        self.ports = {platform: base_port + i for i, platform in enumerate(ORIGINS)}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._bodies = {}
+        self._stats = {platform: {'statuses': {}, 'latencies': []} for platform in ORIGINS}
+
+    def base_url(self, platform):
+        return f"http://{self.host}:{self.ports[platform]}"
+
+    def _body(self, platform, path_qs):
+        """Recorded body for a path on the real site with its links rewritten, or None."""
+        key = (platform, path_qs)
+        if key not in self._bodies:
+            entry = self.cache.load(ORIGINS[platform] + path_qs)
+            self._bodies[key] = None if entry is None else \
+                entry['body'].replace(ORIGINS[platform], self.base_url(platform))
+        return self._bodies[key]
+
+    def _pick_status(self):
+        roll = random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return 200
+
+    async def handle(self, request):
+        platform = request.app['platform']
+        start = time.monotonic()
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        status = self._pick_status()
+        if status == 429:
+            response = web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+        elif status == 500:
+            response = web.Response(status=500)
+        else:
+            body = self._body(platform, request.path_qs)
+            if body is None:
+                response = web.Response(status=404, text="Not recorded")
+            else:
+                response = web.Response(text=body, content_type='text/html')
+
+        stats = self._stats[platform]
+        stats['statuses'][response.status] = stats['statuses'].get(response.status, 0) + 1
+        stats['latencies'].append(time.monotonic() - start)
+        return response
+
+    async def handle_stats(self, request):
+        stats = self._stats[request.app['platform']]
+        latencies = stats['latencies']
+        return web.json_response({
+            'requests': len(latencies),
+            'statuses': {str(status): count for status, count in stats['statuses'].items()},
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+        })
+
+    async def handle_reset(self, request):
+        self._stats[request.app['platform']] = {'statuses': {}, 'latencies': []}
+        return web.json_response({'reset': True})
+
+    def make_app(self, platform):
+        app = web.Application()
+        app['platform'] = platform
+        app.router.add_get('/__stats', self.handle_stats)
+        app.router.add_get('/__reset', self.handle_reset)
+        app.router.add_get('/{tail:.*}', self.handle)
+        return app
+
+    async def serve(self):
+        """Start one site per platform and run until cancelled."""
+        runners = []
+        try:
+            for platform, port in self.ports.items():
+                runner = web.AppRunner(self.make_app(platform), access_log=None)
+                await runner.setup()
+                await web.TCPSite(runner, self.host, port).start()
+                runners.append(runner)
+                print(f"Serving {platform} ({ORIGINS[platform]}) on {self.base_url(platform)}")
+            await asyncio.Event().wait()
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+
+def add_arguments(parser):
+    """Server options, shared with the benchmark harness."""
+    parser.add_argument('--cache-dir', default='data/cache/http', help="HTTP cache holding the recorded pages")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--base-port', type=int, default=8081, help="first port; platforms use consecutive ports")
+    parser.add_argument('--latency', type=float, default=0.2, help="fixed delay added to every response (s)")
+    parser.add_argument('--jitter', type=float, default=0.1, help="extra random delay up to this value (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After sent with injected 429s (s)")
+
+
+def from_arguments(args):
+    return MockMarketplace(args.cache_dir, args.host, args.base_port, args.latency, args.jitter,
+                           args.error_rate, args.throttle_rate, args.retry_after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    try:
+        asyncio.run(from_arguments(parser.parse_args()).serve())
+    except KeyboardInterrupt:
+        pass
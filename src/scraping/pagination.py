@@ -0,0 +1,137 @@
+import asyncio
+from collections import deque
+
+# Result pages requested ahead of the one being processed
+SPECULATIVE_PAGES = 3
+
+# A page where more than this share of the items appeared on earlier pages ends the category
+MAX_DUPLICATE_SHARE = 0.8
+
+# A page with fewer results than this share of the fullest page so far is taken as the last one
+MIN_RESULT_SHARE = 0.5
+
+# Pages in a row that fail to load before a category is given up
+MAX_FAILED_PAGES = 3
+
+
+class AdaptivePagination:
+    """Decides when a category's result pages have stopped producing new items.
+
+    Pages are observed in order. The category ends after a page that has no item
+    IDs unseen on earlier pages, whose share of repeated items passes
+    `max_duplicate_share`, or whose result count drops below `min_result_share` of
+    the fullest page so far (a partial last page). `max_pages` remains a hard cap.
+
+    `pages()` and `pages_async()` keep up to `window` pages in flight ahead of the
+    one being processed, yield them in page order, and drop the speculative pages
+    that turn out to lie past the end. A page whose fetch returns None failed to
+    load: it is skipped without being observed, and the category only ends after
+    `max_failures` such pages in a row.
+    """
+
+    def __init__(self, max_pages, first_page=1, window=SPECULATIVE_PAGES,
+                 max_duplicate_share=MAX_DUPLICATE_SHARE, min_result_share=MIN_RESULT_SHARE,
+                 max_failures=MAX_FAILED_PAGES):
+        self.max_pages = max_pages
+        self.first_page = first_page
+        self.window = max(1, window)
+        self.max_duplicate_share = max_duplicate_share
+        self.min_result_share = min_result_share
+        self.max_failures = max_failures
+        self.stop_reason = None
+        self.observed = 0
+        self.failed = 0
+        self.discarded = 0
+        self._failures_in_row = 0
+        self._seen = set()
+        self._most_results = 0
+
+    def observe(self, page, item_ids):
+        """Record the item IDs listed on `page`; returns False once no further page is worth fetching."""
+        item_ids = list(item_ids)
+        new_ids = set(item_ids) - self._seen
+        repeated = len(item_ids) - len(new_ids)
+        self._seen.update(new_ids)
+        self.observed += 1
+
+        if not new_ids:
+            self.stop_reason = f"page {page} had no new items"
+        elif repeated / len(item_ids) > self.max_duplicate_share:
+            self.stop_reason = f"page {page} was {repeated / len(item_ids):.0%} repeats"
+        elif len(item_ids) < self.min_result_share * self._most_results:
+            self.stop_reason = f"page {page} had {len(item_ids)} results, down from {self._most_results}"
+        elif page >= self.max_pages:
+            self.stop_reason = f"reached the {self.max_pages}-page limit"
+        self._most_results = max(self._most_results, len(item_ids))
+        return self.stop_reason is None
+
+    def _failed(self, page):
+        """Count a page that failed to load; returns False once too many failed in a row."""
+        self.failed += 1
+        self._failures_in_row += 1
+        if self._failures_in_row >= self.max_failures:
+            self.stop_reason = f"{self._failures_in_row} pages in a row failed to load (last: page {page})"
+            return False
+        return True
+
+    def pages(self, fetch_page, item_ids, executor):
+        """Yield (page, result) in order, fetching up to `window` pages ahead on `executor`.
+
+        `fetch_page(page)` downloads one page, returning None if it fails, and
+        `item_ids(result)` lists the item IDs on it, duplicates included.
+        """
+        in_flight = deque()
+        next_page = self.first_page
+        try:
+            while True:
+                while len(in_flight) < self.window and next_page <= self.max_pages:
+                    in_flight.append((next_page, executor.submit(fetch_page, next_page)))
+                    next_page += 1
+                if not in_flight:
+                    return
+                page, future = in_flight.popleft()
+                result = future.result()
+                if result is None:
+                    if not self._failed(page):
+                        return
+                    continue
+                self._failures_in_row = 0
+                self.observe(page, item_ids(result))
+                yield page, result
+                if self.stop_reason is not None:
+                    return
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            self.discarded += len(in_flight)
+
+    async def pages_async(self, fetch_page, item_ids):
+        """Async counterpart of pages(): `fetch_page(page)` is a coroutine function."""
+        in_flight = deque()
+        next_page = self.first_page
+        try:
+            while True:
+                while len(in_flight) < self.window and next_page <= self.max_pages:
+                    in_flight.append((next_page, asyncio.ensure_future(fetch_page(next_page))))
+                    next_page += 1
+                if not in_flight:
+                    return
+                page, task = in_flight.popleft()
+                result = await task
+                if result is None:
+                    if not self._failed(page):
+                        return
+                    continue
+                self._failures_in_row = 0
+                self.observe(page, item_ids(result))
+                yield page, result
+                if self.stop_reason is not None:
+                    return
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            self.discarded += len(in_flight)
+
+    def stats(self):
+        return {'pages': self.observed, 'failed': self.failed, 'speculative_discarded': self.discarded,
+                'stop_reason': self.stop_reason}
@@ -0,0 +1,75 @@
+import asyncio
+
+
+def run_batch(jobs):
+    """Run a batch of (function, args) parse jobs in a worker process.
+
+    Exceptions are returned rather than raised so one bad page does not fail the batch.
+    """
+    results = []
+    for func, args in jobs:
+        try:
+            results.append((True, func(*args)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class ParseBatcher:
+    """Moves CPU-bound parsing off the event loop.
+
+    `parse()` queues a call to a module-level parse function and returns its result.
+    Calls are grouped into batches of up to `batch_size` (or whatever is queued after
+    `max_delay` seconds) and each batch is sent to the executor as one task, which
+    keeps pickling and IPC overhead per page low. Without an executor the function is
+    simply called inline, which is the original behaviour.
+    """
+
+    def __init__(self, executor=None, batch_size=8, max_delay=0.05):
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+
+    async def parse(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((func, args, future))
+        if len(self._pending) >= self.batch_size:
+            self._submit()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._submit)
+        return await future
+
+    def _submit(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        jobs = [(func, args) for func, args, _ in batch]
+        futures = [future for _, _, future in batch]
+        batch_future = asyncio.get_running_loop().run_in_executor(self.executor, run_batch, jobs)
+        batch_future.add_done_callback(lambda done: self._distribute(done, futures))
+
+    @staticmethod
+    def _distribute(done, futures):
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, (ok, value) in zip(futures, done.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
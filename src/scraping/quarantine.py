@@ -0,0 +1,72 @@
+import time
+
+
+class Quarantine:
+    """Work items that hit a bot check, held back and retried after a cool-down.
+
+    A challenged page is not worth retrying straight away, and waiting for it would
+    hold up everything else. `add()` parks an item; `ready()` hands back the items
+    whose cool-down has passed so the caller can retry them between other work.
+    Items that are still challenged after `max_attempts` are abandoned.
+
+    A quarantine is scoped to one unit of work such as a category: items still
+    parked when that work ends are given up with `clear()` rather than carried over.
+    """
+
+    def __init__(self, cooldown=60.0, max_attempts=3):
+        self.cooldown = cooldown
+        self.max_attempts = max_attempts
+        self.deferred = 0
+        self.recovered = 0
+        self.abandoned = 0
+        self._items = {}  # key -> (item, attempts, retry_at)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, key, item):
+        """Park an item after a challenge; returns False once it has used up its attempts."""
+        _, attempts, _ = self._items.get(key, (item, 0, 0.0))
+        attempts += 1
+        if attempts >= self.max_attempts:
+            self._items.pop(key, None)
+            self.abandoned += 1
+            return False
+        if attempts == 1:
+            self.deferred += 1
+        # Later attempts wait longer, in case the site is still suspicious
+        self._items[key] = (item, attempts, time.monotonic() + self.cooldown * attempts)
+        return True
+
+    def ready(self):
+        """Return the (key, item) pairs whose cool-down is over; they stay parked until resolved."""
+        now = time.monotonic()
+        return [(key, item) for key, (item, _, retry_at) in self._items.items() if retry_at <= now]
+
+    def resolve(self, key):
+        """Mark a parked item as done after a successful retry."""
+        if self._items.pop(key, None) is not None:
+            self.recovered += 1
+
+    def discard(self, key):
+        """Stop retrying an item that failed for a reason other than a challenge."""
+        self._items.pop(key, None)
+
+    def clear(self):
+        """Abandon every item still parked, e.g. when the work they belong to has ended."""
+        self.abandoned += len(self._items)
+        self._items.clear()
+
+    def wait_time(self):
+        """Seconds until the next parked item is ready, or None if nothing is parked."""
+        if not self._items:
+            return None
+        return max(0.0, min(retry_at for _, _, retry_at in self._items.values()) - time.monotonic())
+
+    def stats(self):
+        return {
+            'deferred': self.deferred,
+            'recovered': self.recovered,
+            'abandoned': self.abandoned,
+            'pending': len(self._items),
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Allowed request rate per site: (requests per second, burst size). The defaults
+# are at or above what the original fixed sleeps achieved: about 0.5 req/s for
+# eBay (2 requests at a time, 2-5 s apart), 1.5-2 req/s for Flipkart (detail pages
+# back to back, 3-7 s between listing pages) and 0.8 req/s for Ubuy (5 browsers,
+# 2-5 s apart).
+PLATFORM_RATES = {
+    "www.ebay.com": (2.0, 4),
+    "www.flipkart.com": (2.0, 4),
+    "www.ubuy.ma": (0.8, 2),
+    # Ubuy product pages fetched over plain HTTP in hybrid mode: one HTML document
+    # each, against the dozens of scripts, images and API calls behind every
+    # browser page load, so the site sees far fewer requests per product
+    "www.ubuy.ma#http": (3.0, 6),
+}
+DEFAULT_RATE = (1.0, 1)
+
+# Environment variable overriding the rates, e.g. "www.flipkart.com=3,www.ubuy.ma#http=5:10"
+# (host[#channel]=requests per second[:burst])
+RATES_ENV = "SCRAPER_RATES"
+
+
+def parse_rates(spec):
+    """Parse a SCRAPER_RATES value into {host: (rate, burst)}."""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, value = entry.partition('=')
+        rate, _, burst = value.partition(':')
+        try:
+            rates[host.strip()] = (float(rate), int(burst) if burst else max(1, round(float(rate) * 2)))
+        except ValueError:
+            raise ValueError(f"Invalid {RATES_ENV} entry {entry!r}; expected host=rate[:burst]") from None
+    return rates
+
+
+PLATFORM_RATES.update(parse_rates(os.environ.get(RATES_ENV, "")))
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by threads and coroutines.
+
+    Each request reserves a token under a lock and learns how long it has to wait
+    for it; the caller then sleeps outside the lock (time.sleep or asyncio.sleep).
+    A small random jitter, up to `jitter` of one token interval, is added to every
+    wait so requests do not hit the site on an exact beat.
+    """
+
+    def __init__(self, rate, burst=1, jitter=0.25):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.tokens = burst
+        self.requests = 0
+        self.total_wait = 0.0
+        self._last = time.monotonic()
+        self._started = self._last
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait += random.uniform(0, self.jitter / self.rate)
+            self.requests += 1
+            self.total_wait += wait
+            return wait
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent."""
+        time.sleep(self._reserve())
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        await asyncio.sleep(self._reserve())
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            'requests': self.requests,
+            'rate': round(self.requests / elapsed, 3),
+            'total_wait': round(self.total_wait, 1),
+        }
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in shared memory.
+
+    Worker processes started with the bucket (as a Process or pool initializer
+    argument) draw from one budget, so running categories in parallel does not
+    multiply the request rate against a site.
+    """
+
+    def __init__(self, rate, burst=1, jitter=0.25):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._started = time.monotonic()
+        # tokens, last refill time, requests, total wait
+        self._state = multiprocessing.Array('d', [burst, self._started, 0, 0.0])
+
+    @property
+    def requests(self):
+        return int(self._state[2])
+
+    @property
+    def total_wait(self):
+        return self._state[3]
+
+    def _reserve(self):
+        with self._state.get_lock():
+            tokens, last, requests, total_wait = self._state[:]
+            now = time.monotonic()
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            wait = -tokens / self.rate if tokens < 0 else 0.0
+            wait += random.uniform(0, self.jitter / self.rate)
+            self._state[:] = [tokens, now, requests + 1, total_wait + wait]
+            return wait
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(url, channel=None):
+    """Return the shared token bucket for the domain of `url` (or a bare domain).
+
+    A `channel` such as "http" gets a bucket of its own, rated by the
+    "domain#channel" entry of PLATFORM_RATES.
+    """
+    domain = urlsplit(url).netloc or url
+    if channel is not None:
+        domain = f"{domain}#{channel}"
+    with _limiters_lock:
+        if domain not in _limiters:
+            rate, burst = PLATFORM_RATES.get(domain, DEFAULT_RATE)
+            _limiters[domain] = TokenBucket(rate, burst)
+        return _limiters[domain]
+
+
+def share_rate_limiter(url):
+    """Replace the limiter for the domain of `url` with a SharedTokenBucket and return it.
+
+    Call this in the parent before starting worker processes and hand the bucket to
+    each worker, which registers it with install_rate_limiter().
+    """
+    domain = urlsplit(url).netloc or url
+    rate, burst = PLATFORM_RATES.get(domain, DEFAULT_RATE)
+    limiter = SharedTokenBucket(rate, burst)
+    install_rate_limiter(domain, limiter)
+    return limiter
+
+
+def install_rate_limiter(domain, limiter):
+    """Use `limiter` for every request to `domain` made in this process."""
+    with _limiters_lock:
+        _limiters[domain] = limiter
+
+
+def rate_limit_stats():
+    """Per-domain request counts, achieved rate and total time spent waiting."""
+    with _limiters_lock:
+        return {domain: limiter.stats() for domain, limiter in _limiters.items()}
@@ -0,0 +1,114 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+# Prior used while an item has little history: half a change over one extra day
+PRIOR_CHANGES = 0.5
+PRIOR_DAYS = 1.0
+
+
+def parse_price(text):
+    """First number in a price string such as '$1,299.99' or '₹12,999', or None."""
+    match = PRICE_RE.search(text or '')
+    return float(match.group().replace(',', '')) if match else None
+
+
+class PriceHistory:
+    """Persistent SQLite record of how often each product's price has changed.
+
+    Every observed price is compared with the previous one for the same item ID;
+    per item the store keeps its URL, category, latest price, when it was first and
+    last checked, and how many checks found a changed price.
+    """
+
+    def __init__(self, path="data/cache/price_history.sqlite"):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.recorded = 0
+        self.changed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices (item_id TEXT PRIMARY KEY, url TEXT NOT NULL, category TEXT NOT NULL, "
+            "price REAL, first_seen REAL NOT NULL, last_checked REAL NOT NULL, checks INTEGER NOT NULL, "
+            "changes INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def record(self, item_id, url, category, price_text):
+        """Store an observed price; returns True if it differs from the last one seen."""
+        price = parse_price(price_text)
+        if item_id is None or price is None:
+            return False
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT price FROM prices WHERE item_id = ?", (item_id,)).fetchone()
+            changed = row is not None and row[0] is not None and abs(row[0] - price) >= 0.01
+            self._conn.execute(
+                "INSERT INTO prices (item_id, url, category, price, first_seen, last_checked, checks, changes) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, 0) "
+                "ON CONFLICT(item_id) DO UPDATE SET url = excluded.url, category = excluded.category, "
+                "price = excluded.price, last_checked = excluded.last_checked, checks = checks + 1, "
+                "changes = changes + ?",
+                (item_id, url, category, price, now, now, int(changed)),
+            )
+            self._conn.commit()
+            self.recorded += 1
+            self.changed += changed
+        return changed
+
+    def items(self, platform=None):
+        """Rows of (item_id, url, category, first_seen, last_checked, checks, changes)."""
+        query = "SELECT item_id, url, category, first_seen, last_checked, checks, changes FROM prices"
+        params = ()
+        if platform is not None:
+            query += " WHERE item_id LIKE ?"
+            params = (f"{platform}:%",)
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def stats(self):
+        return {'recorded': self.recorded, 'changed': self.changed}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RecrawlScheduler:
+    """Spends a fixed per-run request budget on the products most likely to have changed price.
+
+    Each product's price changes are treated as a Poisson process whose daily rate
+    is estimated from its history (changes seen over the days it has been watched,
+    smoothed towards a prior so products with few checks are neither ignored nor
+    trusted blindly). The chance that a product has changed since its last check is
+    1 - exp(-rate * days since the check), and `plan()` picks the `budget` products
+    with the highest chance. Volatile products are revisited within a day or two,
+    stable ones only once their long gap has made a change likely.
+    """
+
+    def __init__(self, history, budget):
+        self.history = history
+        self.budget = budget
+
+    @staticmethod
+    def change_rate(first_seen, last_checked, changes):
+        """Estimated price changes per day."""
+        watched_days = (last_checked - first_seen) / 86400
+        return (changes + PRIOR_CHANGES) / (watched_days + PRIOR_DAYS)
+
+    def change_probability(self, row, now):
+        _, _, _, first_seen, last_checked, _, changes = row
+        rate = self.change_rate(first_seen, last_checked, changes)
+        return 1 - math.exp(-rate * (now - last_checked) / 86400)
+
+    def plan(self, platform=None, now=None):
+        """Return up to `budget` (item_id, url, category, probability) tuples, most likely changed first."""
+        now = time.time() if now is None else now
+        scored = [(self.change_probability(row, now), row) for row in self.history.items(platform)]
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        return [(row[0], row[1], row[2], probability) for probability, row in scored[:self.budget]]
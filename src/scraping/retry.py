@@ -0,0 +1,151 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+import requests
+
+# HTTP statuses worth retrying; anything else (404, 410, ...) fails immediately
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Network-level errors worth retrying
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+def response_status(exc):
+    """HTTP status carried by an aiohttp or requests error, if any."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code
+    return None
+
+
+def retry_after(exc):
+    """Seconds requested by a Retry-After header on the error's response, if any."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        headers = exc.headers or {}
+    elif isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        headers = exc.response.headers
+    else:
+        return None
+
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Retries transient failures with exponential backoff and full jitter.
+
+    Attempt n waits a random time in [0, min(cap, base * 2**n)], or the server's
+    Retry-After if that is longer. All retries in a run draw from one shared
+    `budget`, so a site that is down cannot multiply the run time; once the
+    budget is spent, failures are returned to the caller straight away.
+    """
+
+    def __init__(self, max_attempts=4, base=1.0, cap=30.0, budget=200, max_retry_after=120.0):
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self.budget = budget
+        self.max_retry_after = max_retry_after
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def is_retryable(self, exc, retry_on=()):
+        status = response_status(exc)
+        if status is not None:
+            return status in RETRYABLE_STATUSES
+        return isinstance(exc, RETRYABLE_ERRORS + tuple(retry_on))
+
+    def _next_delay(self, exc, attempt, retry_on):
+        """Return the backoff before the next attempt, or None to give up."""
+        if attempt + 1 >= self.max_attempts or not self.is_retryable(exc, retry_on):
+            return None
+        with self._lock:
+            if self.budget <= 0:
+                return None
+            self.budget -= 1
+            self.retries += 1
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        server_delay = retry_after(exc)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_retry_after))
+        return delay
+
+    def _count(self, failed):
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.failures += 1
+
+    def call(self, func, *args, retry_on=(), **kwargs):
+        """Call `func` in the current thread, retrying transient errors."""
+        attempt = 0
+        while True:
+            try:
+                result = func(*args, **kwargs)
+                self._count(False)
+                return result
+            except Exception as e:
+                delay = self._next_delay(e, attempt, retry_on)
+                if delay is None:
+                    self._count(True)
+                    raise
+                print(f"Retrying in {delay:.1f}s after error: {e}")
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, func, *args, retry_on=(), **kwargs):
+        """Await `func(*args, **kwargs)`, retrying transient errors."""
+        attempt = 0
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+                self._count(False)
+                return result
+            except Exception as e:
+                delay = self._next_delay(e, attempt, retry_on)
+                if delay is None:
+                    self._count(True)
+                    raise
+                print(f"Retrying in {delay:.1f}s after error: {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'budget_left': self.budget,
+            }
+
+
+_policy = RetryPolicy()
+
+
+def get_retry_policy():
+    """Return the retry policy shared by every scraper in this process."""
+    return _policy
@@ -0,0 +1,52 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SpecCache:
+    """Persistent SQLite cache of product details keyed by item ID, with a TTL.
+
+    Specifications rarely change between runs, so a product whose details were
+    stored less than `ttl_days` ago can be saved from its listing entry without
+    downloading the detail page again.
+    """
+
+    def __init__(self, path="data/cache/specs.sqlite", ttl_days=7):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.ttl = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS specs (item_id TEXT PRIMARY KEY, details TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, item_id):
+        """Return the cached details for an item, or None if absent or older than the TTL."""
+        with self._lock:
+            row = self._conn.execute("SELECT details, fetched_at FROM specs WHERE item_id = ?", (item_id,)).fetchone()
+            if row is None or time.time() - row[1] >= self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, item_id, details):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO specs (item_id, details, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(item_id) DO UPDATE SET details = excluded.details, fetched_at = excluded.fetched_at",
+                (item_id, json.dumps(details), time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,91 @@
+import json
+import os
+import re
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library parser gives the same result, only slower
+    orjson = None
+
+# Environment variable to disable structured-data extraction ("0") and always walk the DOM
+STRUCTURED_ENV = "SCRAPER_STRUCTURED_DATA"
+
+# Module-level switch read by the parse functions; the benchmark swaps it at runtime
+ENABLED = os.environ.get(STRUCTURED_ENV, "1") != "0"
+
+# Only the JSON-LD script blocks are located, with a regex instead of building a DOM
+JSON_LD_RE = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def json_ld_objects(html):
+    """Yield every object in the page's application/ld+json blocks, flattening lists and @graph."""
+    for match in JSON_LD_RE.finditer(html):
+        try:
+            data = loads(match.group(1).strip())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop(0)
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                yield item
+                if isinstance(item.get('@graph'), list):
+                    stack.extend(item['@graph'])
+
+
+def _is_product(item):
+    types = item.get('@type')
+    types = types if isinstance(types, list) else [types]
+    return 'Product' in types or 'IndividualProduct' in types
+
+
+def _name(value):
+    """Text of a schema.org value that may be a plain string or an object with a name."""
+    if isinstance(value, dict):
+        value = value.get('name')
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return str(value).strip() if value not in (None, '') else None
+
+
+def product_data(html):
+    """Extract the schema.org Product of a page as a flat dict, or None if there is none.
+
+    Keys: name, brand, model, price, currency, rating, rating_count and properties
+    (a dict of additionalProperty names to values). Missing values are None.
+    """
+    product = next((item for item in json_ld_objects(html) if _is_product(item)), None)
+    if product is None:
+        return None
+
+    offers = product.get('offers') or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    price = offers.get('price', offers.get('lowPrice'))
+    rating = product.get('aggregateRating') or {}
+
+    properties = {}
+    for prop in product.get('additionalProperty') or []:
+        if isinstance(prop, dict) and prop.get('name') and prop.get('value') not in (None, ''):
+            properties[str(prop['name']).strip()] = str(prop['value']).strip()
+
+    return {
+        'name': _name(product.get('name')),
+        'brand': _name(product.get('brand')),
+        'model': _name(product.get('model')) or _name(product.get('mpn')),
+        'price': str(price) if price not in (None, '') else None,
+        'currency': offers.get('priceCurrency'),
+        'rating': str(rating['ratingValue']) if rating.get('ratingValue') is not None else None,
+        'rating_count': str(rating.get('ratingCount', rating.get('reviewCount')))
+        if rating.get('ratingCount', rating.get('reviewCount')) is not None else None,
+        'properties': properties,
+    }
@@ -1,39 +1,141 @@
+import argparse
 import os
-import csv
 import time
 import random
 import logging
+import threading
+from collections import Counter
 from datetime import datetime
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from bs4 import SoupStrainer
+import soupsieve
 from webdriver_manager.chrome import ChromeDriverManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
 import undetected_chromedriver as uc
+from checkpoint import ScrapeCheckpoint
+from http_cache import CacheMiss, canonical_url, get_default_cache
+from html_parsing import class_pattern, make_soup
+from rate_limit import get_rate_limiter, rate_limit_stats
+from dedupe import ItemDeduper, SeenStore, canonical_item_id
+from retry import get_retry_policy
+from driver_pool import DriverPool
+from context_pool import ContextPage, ContextPool
+from browser_session import BrowserSession, ChallengeDetected
+from pagination import AdaptivePagination
+from quarantine import Quarantine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Prefix of relative product links (bench_scrapers.py swaps in the mock marketplace)
+UBUY_BASE_URL = "https://www.ubuy.ma"
+
+# Listing URL and page cap per category
+CATEGORIES = {
+    "graphics_cards": ("https://www.ubuy.ma/en/search/?ref_p=ser_tp&q=graphics+cards", 8),
+    "laptops": ("https://www.ubuy.ma/en/category/laptops-21457", 8),
+    "monitors": ("https://www.ubuy.ma/en/search/?q=computer%20monitor", 8),
+    "smart_watches": ("https://www.ubuy.ma/en/search/?ref_p=ser_tp&q=smart+watch", 8)
+}
+
+# Resolved chromedriver binary path, reused across runs
+DRIVER_PATH_CACHE = "data/cache/chromedriver_path.txt"
+
+# Lean browser profile: no images, fonts or analytics, and an eager page-load strategy.
+# SCRAPER_LEAN_BROWSER=0 restores the full profile.
+LEAN_BROWSER_ENV = "SCRAPER_LEAN_BROWSER"
+LEAN_BROWSER = os.environ.get(LEAN_BROWSER_ENV, "1") != "0"
+BLOCKED_URL_PATTERNS = (
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*criteo.com*",
+    "*tiktok.com*", "*snapchat.com*", "*bing.com/action*",
+)
+
+# Browsers scraping product pages in parallel, and page loads before a browser is replaced
+DETAIL_WORKERS = 5
+PAGES_PER_BROWSER = 50
+
+# Marker of a CAPTCHA challenge on a loaded page
+CAPTCHA_SELECTOR = "iframe[src*='captcha']"
+
+# Seconds a page that showed a CAPTCHA waits before it is retried
+CAPTCHA_COOLDOWN = 60
+
+# Product pages fetched at once over plain HTTP in hybrid mode
+HTTP_WORKERS = 16
+
+PRODUCT_PAGE_STRAINER = SoupStrainer('div', id=['additional-info', 'technical-info'])
+LISTING_PAGE_STRAINER = SoupStrainer(['div', 'li'], class_=class_pattern('product-card', 'page-item'))
+SPEC_TABLE_SELECTOR = soupsieve.compile("div#additional-info table, div#technical-info table")
+
 # Shared Functions
-def get_driver():
-    """Initialize an undetected ChromeDriver instance."""
+def get_chromedriver_path(refresh=False):
+    """Returns the chromedriver binary path, asking ChromeDriverManager only when it is not cached.
+
+    The path resolved by the first run is stored in DRIVER_PATH_CACHE, so later starts
+    skip the version lookup; `refresh` forces a new lookup (e.g. after a Chrome update).
+    """
+    if not refresh and os.path.exists(DRIVER_PATH_CACHE):
+        with open(DRIVER_PATH_CACHE, encoding='utf-8') as f:
+            path = f.read().strip()
+        if os.access(path, os.X_OK):
+            return path
+
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+    with open(DRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+        f.write(path)
+    return path
+
+def get_chrome_options(lean=None):
+    """Builds the Chrome options used for every browser.
+
+    The lean profile (the default unless SCRAPER_LEAN_BROWSER=0) skips images and
+    returns from navigation at DOMContentLoaded instead of waiting for every
+    subresource; load_page() waits for the content it needs anyway.
+    """
+    lean = LEAN_BROWSER if lean is None else lean
+    options = uc.ChromeOptions()
+    options.headless = False  # Set to False for debugging
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920x1080")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument(f"--user-agent={get_random_user_agent()}")
+    if lean:
+        options.page_load_strategy = 'eager'
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+def block_requests(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Makes the browser drop requests matching `patterns` (fonts, analytics) through CDP."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+def get_driver(lean=None):
+    """Initialize an undetected ChromeDriver instance, with the lean profile unless `lean` is False."""
+    lean = LEAN_BROWSER if lean is None else lean
     try:
         logging.info("Initializing ChromeDriver...")
-        options = uc.ChromeOptions()
-        options.headless = False  # Set to False for debugging
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920x1080")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(f"--user-agent={get_random_user_agent()}")
-
-        service = Service(ChromeDriverManager().install())
-        driver = uc.Chrome(service=service, options=options)
+        try:
+            driver = uc.Chrome(driver_executable_path=get_chromedriver_path(), options=get_chrome_options(lean))
+        except WebDriverException as e:
+            # A Chrome update leaves the cached driver stale; resolve it once more
+            logging.info(f"Cached ChromeDriver failed to start ({e}), resolving it again...")
+            driver = uc.Chrome(driver_executable_path=get_chromedriver_path(refresh=True),
+                               options=get_chrome_options(lean))
+        if lean:
+            block_requests(driver)
         logging.info("ChromeDriver initialized successfully!")
         return driver
     except Exception as e:
@@ -49,72 +151,82 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def handle_captcha(driver):
-    """Pause execution and allow the user to solve CAPTCHA manually."""
-    logging.info("CAPTCHA detected. Please solve it manually.")
-    start_time = time.time()
-    timeout = 120  # 2 minutes timeout for solving CAPTCHA
+def load_page(driver, url, ready_selector, cache=None):
+    """Loads a page in the browser (or from the cache in replay mode) and returns its HTML.
 
-    while True:
-        input("Press Enter to continue after solving the CAPTCHA...")
-        time.sleep(5)  # Wait for a few seconds to allow the page to update
+    Raises ChallengeDetected when the page shows a CAPTCHA, so the caller can set the
+    page aside and retry it later instead of waiting for someone to solve it.
+    """
+    if cache is not None and cache.replay:
+        return cache.replay_body(url)
 
-        # Check if CAPTCHA is still present
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[src*='captcha']"))
-            )
-            logging.info("CAPTCHA still present. Please solve it again.")
-        except:
-            logging.info("CAPTCHA resolved. Resuming script execution...")
-            driver.refresh()  # Refresh the page to ensure CAPTCHA is fully resolved
-            time.sleep(5)  # Wait for the page to load after refresh
-            break
-
-        # Check if the timeout has been reached
-        if time.time() - start_time > timeout:
-            logging.error("Timeout reached while solving CAPTCHA. Exiting...")
-            driver.quit()
-            exit(1)
-
-def scrape_product_details(driver, product_url):
-    """Scrapes detailed product specifications from a product page."""
-    try:
-        logging.info(f"Scraping product: {product_url}")
-        driver.get(product_url)
-        time.sleep(random.uniform(2, 5))  # Random delay
+    get_rate_limiter(url).acquire()  # Shared per-domain politeness limit
+    if isinstance(driver, ContextPage):
+        html = driver.load(url, ready_selector, CAPTCHA_SELECTOR)
+    else:
+        # Navigation errors (network failures, page-load timeouts) are retried with backoff
+        get_retry_policy().call(driver.get, url, retry_on=(WebDriverException,))
 
-        # Check for CAPTCHA
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[src*='captcha']"))
-            )
-            handle_captcha(driver)  # Pause for manual CAPTCHA solving
-        except:
-            logging.info("No CAPTCHA detected. Proceeding with scraping...")
-
-        # Wait for the specifications table to load
+        # One wait that ends as soon as either the content or a CAPTCHA shows up
         WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div#additional-info table, div#technical-info table"))
+            EC.presence_of_element_located((By.CSS_SELECTOR, f"{ready_selector}, {CAPTCHA_SELECTOR}"))
         )
+        if driver.find_elements(By.CSS_SELECTOR, CAPTCHA_SELECTOR):
+            raise ChallengeDetected(f"CAPTCHA on {url}")
+
+        html = driver.page_source
+    if cache is not None:
+        # The browser cannot send conditional requests, so the rendered page is stored as-is
+        cache.store(url, html, {})
+    return html
+
+def parse_product_page(html):
+    """Extracts the specification tables of a product page into a dict."""
+    soup = make_soup(html, PRODUCT_PAGE_STRAINER)
+    specs = {}
+
+    # Extract specifications
+    spec_tables = SPEC_TABLE_SELECTOR.select(soup)
+    for table in spec_tables:
+        for row in table.find_all("tr"):
+            cols = row.find_all("td")
+            if len(cols) == 2:
+                key = cols[0].text.strip()
+                value = cols[1].text.strip()
+                specs[key] = value
+
+    return specs
+
+def scrape_product_details(driver, product_url, cache=None):
+    """Scrapes detailed product specifications from a product page."""
+    try:
+        logging.info(f"Scraping product: {product_url}")
+        html = load_page(driver, product_url, "div#additional-info table, div#technical-info table", cache)
+        return parse_product_page(html)
+    except ChallengeDetected:
+        raise
+    except Exception as e:
+        logging.error(f"Error scraping {product_url}: {e}")
+        return {}
 
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        specs = {}
-
-        # Extract specifications
-        spec_tables = soup.select("div#additional-info table, div#technical-info table")
-        for table in spec_tables:
-            for row in table.find_all("tr"):
-                cols = row.find_all("td")
-                if len(cols) == 2:
-                    key = cols[0].text.strip()
-                    value = cols[1].text.strip()
-                    specs[key] = value
+def scrape_product_details_http(http, product_url, cache=None):
+    """Scrapes a product page over plain HTTP with a BrowserSession.
 
-        return specs
+    Returns None when the site answers with a bot check, so the caller can load the
+    page in a browser instead.
+    """
+    try:
+        logging.info(f"Scraping product over HTTP: {product_url}")
+        html = http.fetch(product_url)
+    except ChallengeDetected as e:
+        logging.info(f"{e}; falling back to the browser")
+        return None
     except Exception as e:
         logging.error(f"Error scraping {product_url}: {e}")
         return {}
+    if cache is not None:
+        cache.store(product_url, html, {})
+    return parse_product_page(html)
 
 def get_next_scrape_number(output_dir, category):
     """Determines the next scrape number for versioning output files."""
@@ -129,116 +241,205 @@ def get_next_scrape_number(output_dir, category):
                 continue
     return scrape_number
 
-def save_to_csv(data, category, all_spec_keys):
-    """Saves scraped data to a CSV file with specifications in separate columns."""
-    # Create category-specific directory
+def get_output_dir(category):
+    """Returns (and creates) the category-specific output directory."""
     output_dir = os.path.join("data/raw/ubuy", category)
     os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+def get_checkpoint(category):
+    """Returns the resumable checkpoint used to stream today's records for a category."""
+    today_date = datetime.today().strftime("%Y_%m_%d")
+    return ScrapeCheckpoint(
+        get_output_dir(category),
+        f"{category}_{today_date}",
+        fieldnames=["title", "price", "image_url", "product_url", "Collection Date"],
+    )
+
+def save_to_csv(checkpoint, category):
+    """Writes the streamed records to a CSV file with specifications in separate columns."""
+    output_dir = get_output_dir(category)
 
     today_date = datetime.today().strftime("%Y_%m_%d")
     scrape_number = get_next_scrape_number(output_dir, category)
     filename = f"{category}_{today_date}_scrape{scrape_number}.csv"
     filepath = os.path.join(output_dir, filename)
 
-    # Add "Collection Date" to the fieldnames
-    fieldnames = ["title", "price", "image_url", "product_url", "Collection Date"] + list(all_spec_keys)
-
-    with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for item in data:
-            row = {
-                "title": item["title"],
-                "price": item["price"],
-                "image_url": item["image_url"],
-                "product_url": item["product_url"],
-                "Collection Date": today_date  # Add the collection date
-            }
-            row.update(item["specifications"])
-            writer.writerow(row)
-
-    logging.info(f"Data saved to {filepath}")
+    if checkpoint.finalize(filepath):
+        logging.info(f"Data saved to {filepath}")
+    else:
+        logging.info(f"No data scraped for {category}.")
+
+def parse_listing_cards(product_blocks):
+    """Maps the canonical URL of each product card to its title, price, image and product URL.
+
+    The first card wins when a product is listed more than once on a page.
+    """
+    cards = {}
+    for product in product_blocks:
+        link_element = product.find('a', class_='product-img')
+        if not (link_element and "href" in link_element.attrs):
+            continue
+        product_url = link_element['href']
+        full_product_url = f"{UBUY_BASE_URL}{product_url}" if product_url.startswith('/') else product_url
+        key = canonical_url(full_product_url)
+        if key in cards:
+            continue
+
+        title_element = product.find('h3', class_='product-title')
+        price_element = product.find('p', class_='product-price')
+        image_element = product.find('img')
+        cards[key] = {
+            "title": title_element.text.strip() if title_element else "No title",
+            "price": price_element.text.strip() if price_element else "No price",
+            "image_url": image_element['src'] if image_element else "No image",
+            "product_url": full_product_url,
+        }
+    return cards
 
 # Category-Specific Scraping Functions
-def scrape_ubuy(driver, base_url, max_pages):
-    """Scrapes product data from multiple pages on Ubuy."""
-    scraped_items = []
-    all_spec_keys = set()
-    
+def get_driver_pool(size=DETAIL_WORKERS, backend="drivers"):
+    """Returns a pool of `size` browsers started on demand.
+
+    The "drivers" backend starts a separate Chrome per worker with get_driver(); the
+    "contexts" backend opens isolated Playwright contexts inside one Chromium process,
+    which needs far less memory per worker.
+    """
+    # A browser that was shown a CAPTCHA is replaced, so retries start from a fresh profile
+    if backend == "contexts":
+        return ContextPool(size=size, max_pages=PAGES_PER_BROWSER, retire_on=(ChallengeDetected,),
+                           lean=LEAN_BROWSER, blocked_patterns=BLOCKED_URL_PATTERNS,
+                           user_agent=get_random_user_agent)
+    return DriverPool(get_driver, size=size, max_pages=PAGES_PER_BROWSER, retire_on=(ChallengeDetected,))
+
+def scrape_ubuy(pool, base_url, max_pages, checkpoint, cache=None, deduper=None, http=None, quarantine=None):
+    """Scrapes product data from multiple pages on Ubuy, streaming records to the checkpoint.
+
+    Product pages go to the browsers of `pool` (a DriverPool, left open for the next
+    category), or over plain HTTP when `http` is a BrowserSession.
+    """
+    deduper = deduper or ItemDeduper()
+    quarantine = quarantine if quarantine is not None else Quarantine(CAPTCHA_COOLDOWN)
+    held_listings = Quarantine(quarantine.cooldown, quarantine.max_attempts)
+    scraped_count = 0
+    today_date = datetime.today().strftime("%Y_%m_%d")
+    if http is not None and cache is not None and cache.replay:
+        http = None
+    browsers = pool.size if pool is not None else DETAIL_WORKERS
+    workers = HTTP_WORKERS if http is not None else browsers
+    # In hybrid mode only as many HTTP workers as there are browsers fall back to one at a time
+    browser_fallbacks = threading.BoundedSemaphore(browsers)
+
+    def borrow_driver():
+        return pool.driver() if pool is not None else nullcontext()
+
+    def fetch_details(url):
+        if http is not None:
+            specifications = scrape_product_details_http(http, url, cache)
+            if specifications is not None:
+                return specifications
+        with browser_fallbacks, borrow_driver() as driver:
+            specifications = scrape_product_details(driver, url, cache)
+            if http is not None:
+                # The browser has just passed the challenge; retry later pages with its fresh cookies
+                http.update_from_driver(driver)
+            return specifications
+
+    def wait_for_listing():
+        """Sleep until the held listing page is due, retrying parked products whose cool-down ends first."""
+        remaining = held_listings.wait_time()
+        while remaining:
+            ready = quarantine.ready()
+            if ready:
+                scrape_cards(ready)
+            else:
+                product_wait = quarantine.wait_time()
+                time.sleep(remaining if product_wait is None else min(remaining, product_wait))
+            remaining = held_listings.wait_time()
+
+    def scrape_cards(keyed_cards):
+        """Scrapes the product pages of (key, card) pairs concurrently and saves the records."""
+        nonlocal scraped_count
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_card = {executor.submit(fetch_details, card["product_url"]): (key, card)
+                              for key, card in keyed_cards}
+            for future in as_completed(future_to_card):
+                key, card = future_to_card[future]
+                url = card["product_url"]
+                try:
+                    specifications = future.result()
+                except ChallengeDetected as e:
+                    if quarantine.add(key, card):
+                        logging.warning(f"{e}; retrying after a cool-down")
+                    else:
+                        logging.error(f"{e}; giving up on this product")
+                    continue
+                except Exception as e:
+                    logging.error(f"Error processing {url}: {e}")
+                    quarantine.discard(key)
+                    continue
+                quarantine.resolve(key)
+                on_saved = partial(deduper.mark_fetched, url) if specifications else None
+                checkpoint.add({
+                    **card,
+                    "Collection Date": today_date,
+                    **specifications
+                }, url=canonical_item_id(url) or url, on_saved=on_saved)
+                scraped_count += 1
+
     try:
+        # Skip the listing pages an interrupted run already finished
         current_page = 1
-        current_url = base_url
+        while checkpoint.is_page_done(current_page):
+            current_page += 1
+        current_url = base_url if current_page == 1 else f"{base_url}&page={current_page}"
+        pagination = AdaptivePagination(max_pages, first_page=current_page)
 
         while current_page <= max_pages:
             logging.info(f"Scraping page {current_page}: {current_url}")
-            driver.get(current_url)
-            time.sleep(random.uniform(3, 6))  # Random delay
-
-            # Check for CAPTCHA
-            try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[src*='captcha']"))
-                )
-                handle_captcha(driver)  # Pause for manual CAPTCHA solving
-            except:
-                logging.info("No CAPTCHA detected. Proceeding with scraping...")
 
             # Wait for product listings
             try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card"))
-                )
-            except Exception as e:
+                with borrow_driver() as driver:
+                    html = load_page(driver, current_url, "div.product-card", cache)
+                    if http is not None:
+                        http.update_from_driver(driver)
+            except ChallengeDetected as e:
+                # Listing pages are needed in order, so this one is retried after the cool-down
+                if held_listings.add(current_url, current_url):
+                    logging.warning(f"{e}; retrying in {held_listings.wait_time():.0f}s on a fresh browser")
+                    wait_for_listing()
+                    continue
+                logging.error(f"{e}; stopping this category")
+                break
+            except (TimeoutException, CacheMiss):
                 logging.error("No products found. Page may have changed.")
                 break
+            held_listings.resolve(current_url)
 
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = make_soup(html, LISTING_PAGE_STRAINER)
             product_blocks = soup.find_all('div', class_='product-card')
 
             if not product_blocks:
                 logging.info("No products found. Exiting scraping.")
                 break
 
-            # Collect product URLs
-            product_urls = []
-            for product in product_blocks:
-                link_element = product.find('a', class_='product-img')
-                if link_element and "href" in link_element.attrs:
-                    product_url = link_element['href']
-                    full_product_url = f"https://www.ubuy.ma{product_url}" if product_url.startswith('/') else product_url
-                    product_urls.append(full_product_url)
-
-            # Scrape details concurrently
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                future_to_url = {executor.submit(scrape_product_details, driver, url): url for url in product_urls}
-                for future in as_completed(future_to_url):
-                    url = future_to_url[future]
-                    try:
-                        specifications = future.result()
-                        all_spec_keys.update(specifications.keys())
-
-                        # Find corresponding product details
-                        for product in product_blocks:
-                            link_element = product.find('a', class_='product-img')
-                            if link_element and "href" in link_element.attrs:
-                                product_url = link_element['href']
-                                full_product_url = f"https://www.ubuy.ma{product_url}" if product_url.startswith('/') else product_url
-                                if full_product_url == url:
-                                    title = product.find('h3', class_='product-title').text.strip() if product.find('h3', class_='product-title') else "No title"
-                                    price = product.find('p', class_='product-price').text.strip() if product.find('p', class_='product-price') else "No price"
-                                    image_url = product.find('img')['src'] if product.find('img') else "No image"
-
-                                    scraped_items.append({
-                                        "title": title,
-                                        "price": price,
-                                        "image_url": image_url,
-                                        "product_url": full_product_url,
-                                        "specifications": specifications
-                                    })
-                                    break
-                    except Exception as e:
-                        logging.error(f"Error processing {url}: {e}")
+            # Listing metadata is read once per page and joined to detail results by URL
+            cards = parse_listing_cards(product_blocks)
+            product_keys = [
+                key for key, card in cards.items()
+                if not checkpoint.is_url_done(canonical_item_id(card["product_url"]) or card["product_url"])
+                and deduper.should_fetch(card["product_url"])
+            ]
+
+            # Scrape details concurrently, along with parked products whose cool-down is over
+            scrape_cards([(key, cards[key]) for key in product_keys] + quarantine.ready())
+
+            checkpoint.mark_page_done(current_page)
+
+            if not pagination.observe(current_page, cards):
+                logging.info(f"Stopping this category: {pagination.stop_reason}")
+                break
 
             # Find and update next page URL
             next_page_element = soup.find('li', class_='page-item', title=str(current_page + 1))
@@ -248,7 +449,6 @@ def scrape_ubuy(driver, base_url, max_pages):
                     next_page_number = next_button['data-pageno']
                     current_url = f"{base_url}&page={next_page_number}"
                     current_page += 1
-                    time.sleep(random.uniform(3, 7))  # Randomized delay to prevent bot detection
                 else:
                     logging.info("No more pages found.")
                     break
@@ -256,32 +456,59 @@ def scrape_ubuy(driver, base_url, max_pages):
                 logging.info("No more pages found.")
                 break
 
+        # Products still parked get their remaining retries before the category ends
+        while len(quarantine):
+            time.sleep(quarantine.wait_time())
+            scrape_cards(quarantine.ready())
+
     except Exception as e:
         logging.error(f"Error during scraping: {e}")
     finally:
-        driver.quit()
+        checkpoint.flush()
+        # Products still parked after an early exit must not be retried under the next category
+        quarantine.clear()
+        logging.info(f"CAPTCHA quarantine: products {quarantine.stats()}, listing pages {held_listings.stats()}")
+        if pool is not None:
+            logging.info(f"Browser pool: {pool.stats()}")
+        if http is not None:
+            logging.info(f"Plain HTTP product pages: {http.stats()}")
 
-    return scraped_items, all_spec_keys
+    return scraped_count
 
 # Main Execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Ubuy category listings and product pages.")
+    parser.add_argument('--hybrid', action='store_true',
+                        help="fetch product pages over plain HTTP with the browser's cookies")
+    parser.add_argument('--browser-backend', choices=["drivers", "contexts"], default="drivers",
+                        help="separate Chrome instances, or Playwright contexts in one browser")
+    args = parser.parse_args()
+
     try:
         logging.info("Starting script...")
-        categories = {
-            "graphics_cards": ("https://www.ubuy.ma/en/search/?ref_p=ser_tp&q=graphics+cards", 8),
-            "laptops": ("https://www.ubuy.ma/en/category/laptops-21457", 8),
-            "monitors": ("https://www.ubuy.ma/en/search/?q=computer%20monitor", 8),
-            "smart_watches": ("https://www.ubuy.ma/en/search/?ref_p=ser_tp&q=smart+watch", 8)
-        }
-
-        for category, (base_url, max_pages) in categories.items():
-            logging.info(f"Scraping {category}...")
-            driver = get_driver()
-            scraped_data, all_spec_keys = scrape_ubuy(driver, base_url, max_pages)
-
-            if scraped_data:
-                save_to_csv(scraped_data, category, all_spec_keys)
-            else:
-                logging.info(f"No data scraped for {category}.")
+        cache = get_default_cache()
+        seen_store = SeenStore()
+        # One pool of warm browsers serves every category
+        pool = None if cache.replay else get_driver_pool(backend=args.browser_backend)
+        http = BrowserSession() if args.hybrid and not cache.replay else None
+        captcha_stats = Counter()
+        try:
+            for category, (base_url, max_pages) in CATEGORIES.items():
+                logging.info(f"Scraping {category}...")
+                checkpoint = get_checkpoint(category)
+                # Each category parks its own products, so none can be saved into another category's file
+                quarantine = Quarantine(CAPTCHA_COOLDOWN)
+                scrape_ubuy(pool, base_url, max_pages, checkpoint, cache, ItemDeduper(seen_store), http, quarantine)
+                captcha_stats.update(quarantine.stats())
+                save_to_csv(checkpoint, category)
+        finally:
+            if pool is not None:
+                pool.close()
+            if http is not None:
+                http.close()
+        seen_store.close()
+        logging.info(f"Request rate: {rate_limit_stats()}")
+        logging.info(f"Retries: {get_retry_policy().stats()}")
+        logging.info(f"Products deferred by CAPTCHAs: {dict(captcha_stats)}")
     except Exception as e:
         logging.error(f"An error occurred: {e}")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from checkpoint import ScrapeCheckpoint
+
+
+def test_on_saved_runs_only_after_the_record_is_flushed(tmp_path):
+    saved = []
+    checkpoint = ScrapeCheckpoint(str(tmp_path), "laptops", batch_size=2)
+
+    checkpoint.add({'title': 'a'}, url='ebay:1', on_saved=lambda: saved.append('ebay:1'))
+    assert saved == []
+
+    checkpoint.add({'title': 'b'}, url='ebay:2', on_saved=lambda: saved.append('ebay:2'))
+    assert saved == ['ebay:1', 'ebay:2']
+    assert checkpoint.records_written == 2
+
+
+def test_unflushed_records_are_not_reported_after_a_crash(tmp_path):
+    saved = []
+    checkpoint = ScrapeCheckpoint(str(tmp_path), "laptops", batch_size=50)
+    checkpoint.add({'title': 'a'}, url='ebay:1', on_saved=lambda: saved.append('ebay:1'))
+    checkpoint.mark_page_done(1)
+    checkpoint.add({'title': 'b'}, url='ebay:2', on_saved=lambda: saved.append('ebay:2'))
+
+    # The process dies here; a restarted run must fetch ebay:2 again
+    resumed = ScrapeCheckpoint(str(tmp_path), "laptops")
+    assert saved == ['ebay:1']
+    assert resumed.is_url_done('ebay:1')
+    assert not resumed.is_url_done('ebay:2')
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from driver_pool import DriverPool
+
+
+class Retire(Exception):
+    pass
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        self.closed = True
+
+
+def run_borrowers(pool, count, body):
+    """Run `count` threads that each borrow one browser and run `body` with it; return the finished count."""
+    finished = []
+
+    def borrow():
+        try:
+            with pool.driver() as driver:
+                body(driver)
+        except Retire:
+            pass
+        finished.append(1)
+
+    threads = [threading.Thread(target=borrow, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return len(finished)
+
+
+def test_waiting_borrowers_get_a_new_browser_when_one_is_retired():
+    pool = DriverPool(FakeDriver, size=2, retire_on=(Retire,))
+
+    def body(driver):
+        time.sleep(0.05)
+        raise Retire()
+
+    assert run_borrowers(pool, 5, body) == 5
+    assert pool.stats() == {'size': 2, 'started': 5, 'recycled': 5}
+
+
+def test_waiting_borrowers_get_a_new_browser_when_one_is_recycled():
+    pool = DriverPool(FakeDriver, size=2, max_pages=1)
+    assert run_borrowers(pool, 6, lambda driver: time.sleep(0.02)) == 6
+    assert pool.stats()['recycled'] == 6
+
+
+def test_never_lends_more_than_size_browsers_at_once():
+    pool = DriverPool(FakeDriver, size=3)
+    lock = threading.Lock()
+    in_use = set()
+    peak = []
+
+    def body(driver):
+        with lock:
+            assert driver not in in_use
+            in_use.add(driver)
+            peak.append(len(in_use))
+        time.sleep(0.02)
+        with lock:
+            in_use.discard(driver)
+
+    assert run_borrowers(pool, 12, body) == 12
+    assert max(peak) == 3
+    assert pool.stats()['started'] == 3
+
+
+def test_failed_start_frees_its_slot():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("chrome failed to start")
+        return FakeDriver()
+
+    pool = DriverPool(factory, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            pass
+    assert run_borrowers(pool, 3, lambda driver: None) == 3
+
+
+def test_close_quits_every_browser():
+    pool = DriverPool(FakeDriver, size=2)
+    drivers = []
+    with pool.driver() as first, pool.driver() as second:
+        drivers += [first, second]
+    pool.close()
+    assert all(driver.closed for driver in drivers)
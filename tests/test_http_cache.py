@@ -0,0 +1,24 @@
+import os
+import time
+
+from http_cache import HttpCache
+
+
+def test_prune_removes_only_expired_entries(tmp_path):
+    cache = HttpCache(str(tmp_path), max_age_days=7)
+    cache.store("https://www.ebay.com/itm/1", "<html>old</html>", {})
+    cache.store("https://www.ebay.com/itm/2", "<html>new</html>", {})
+
+    week_and_a_day_ago = time.time() - 8 * 86400
+    old_meta, _ = cache._paths("https://www.ebay.com/itm/1")
+    os.utime(old_meta, (week_and_a_day_ago, week_and_a_day_ago))
+
+    assert cache.prune() == 1
+    assert cache.load("https://www.ebay.com/itm/1") is None
+    assert cache.load("https://www.ebay.com/itm/2")['body'] == "<html>new</html>"
+
+
+def test_zero_max_age_keeps_everything(tmp_path):
+    cache = HttpCache(str(tmp_path), max_age_days=0)
+    cache.store("https://www.ebay.com/itm/1", "<html></html>", {})
+    assert cache.prune(now=time.time() + 365 * 86400) == 0
@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pagination import AdaptivePagination
+
+
+def crawl(pages, max_pages=18, **kwargs):
+    """Run AdaptivePagination over {page: item IDs or None}; missing pages are empty."""
+    pagination = AdaptivePagination(max_pages, **kwargs)
+    with ThreadPoolExecutor(max_workers=pagination.window) as executor:
+        yielded = [page for page, _ in pagination.pages(lambda page: pages.get(page, []), list, executor)]
+    return yielded, pagination
+
+
+def test_stops_after_a_page_without_new_items():
+    yielded, pagination = crawl({1: ['a', 'b'], 2: ['c', 'd'], 3: ['c', 'd'], 4: ['e', 'f']})
+    assert yielded == [1, 2, 3]
+    assert pagination.stop_reason == "page 3 had no new items"
+
+
+def test_stops_after_a_mostly_repeated_page():
+    yielded, pagination = crawl({1: list('abcdefghij'), 2: list('abcdefghiz'), 3: list('klmnopqrst')})
+    assert yielded == [1, 2]
+    assert "repeats" in pagination.stop_reason
+
+
+def test_stops_after_a_partial_page():
+    yielded, pagination = crawl({1: list('abcdefghij'), 2: list('klm'), 3: list('nopqrstuvw')})
+    assert yielded == [1, 2]
+    assert "down from 10" in pagination.stop_reason
+
+
+def test_a_failed_page_is_skipped_without_ending_the_category():
+    yielded, pagination = crawl({1: ['a'], 2: None, 3: ['b'], 4: ['c']}, max_pages=4)
+    assert yielded == [1, 3, 4]
+    assert pagination.stats()['failed'] == 1
+    assert pagination.stop_reason == "reached the 4-page limit"
+
+
+def test_stops_after_several_failed_pages_in_a_row():
+    yielded, pagination = crawl({1: ['a'], 2: None, 3: None, 4: None, 5: ['b']})
+    assert yielded == [1]
+    assert pagination.stop_reason.startswith("3 pages in a row failed")
+
+
+def test_async_pages_are_yielded_in_order():
+    pages = {1: ['a', 'b'], 2: None, 3: ['c', 'd'], 4: ['c', 'd']}
+
+    async def fetch_page(page):
+        await asyncio.sleep(0.01 * (5 - page))  # later pages finish first
+        return pages.get(page, [])
+
+    async def run():
+        pagination = AdaptivePagination(18)
+        return [page async for page, _ in pagination.pages_async(fetch_page, list)], pagination
+
+    yielded, pagination = asyncio.run(run())
+    assert yielded == [1, 3, 4]
+    assert pagination.stop_reason == "page 4 had no new items"
@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from recrawl import PRIOR_CHANGES, PRIOR_DAYS, PriceHistory, RecrawlScheduler, parse_price
+
+DAY = 86400
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PriceHistory(str(tmp_path / "prices.sqlite"))
+    yield history
+    history.close()
+
+
+def test_parse_price_reads_the_first_number():
+    assert parse_price("US $1,299.99") == 1299.99
+    assert parse_price("₹1,29,999") == 129999
+    assert parse_price("Data not available") is None
+    assert parse_price(None) is None
+
+
+def test_record_counts_only_real_price_changes(history):
+    assert not history.record("ebay:1", "u", "Laptops", "US $899.99")
+    assert not history.record("ebay:1", "u", "Laptops", "$899.99")
+    assert history.record("ebay:1", "u", "Laptops", "US $849.00")
+    assert not history.record("ebay:1", "u", "Laptops", "N/A")
+
+    (row,) = history.items("ebay")
+    assert row[5:] == (3, 1)  # checks, changes
+    assert history.stats() == {'recorded': 3, 'changed': 1}
+
+
+def test_items_are_filtered_by_platform(history):
+    history.record("ebay:1", "u1", "Laptops", "$1")
+    history.record("flipkart:ABC", "u2", "laptops", "₹1")
+    assert [row[0] for row in history.items("flipkart")] == ["flipkart:ABC"]
+
+
+def test_change_rate_is_smoothed_towards_the_prior():
+    assert RecrawlScheduler.change_rate(0, 0, 0) == PRIOR_CHANGES / PRIOR_DAYS
+    # Four changes over nine days of watching: (4 + 0.5) / (9 + 1)
+    assert RecrawlScheduler.change_rate(0, 9 * DAY, 4) == pytest.approx(0.45)
+
+
+def test_plan_ranks_by_change_probability_within_the_budget():
+    class FakeHistory:
+        # (item_id, url, category, first_seen, last_checked, checks, changes)
+        rows = [
+            ("ebay:stable", "u1", "Laptops", 0, 29 * DAY, 30, 0),
+            ("ebay:volatile", "u2", "Laptops", 0, 29 * DAY, 30, 20),
+            ("ebay:stale", "u3", "Laptops", 0, 10 * DAY, 10, 2),
+        ]
+
+        def items(self, platform=None):
+            return self.rows
+
+    now = 30 * DAY
+    plan = RecrawlScheduler(FakeHistory(), budget=2).plan(now=now)
+    assert [item_id for item_id, *_ in plan] == ["ebay:stale", "ebay:volatile"]
+
+    rate = RecrawlScheduler.change_rate(0, 10 * DAY, 2)
+    assert plan[0][3] == pytest.approx(1 - math.exp(-rate * 20))